@@ -0,0 +1,97 @@
+"""
+Compare building the Custom Search client per call with the shared
+AsyncCustomSearchClient, against a local fake API.
+
+Usage:
+    python benchmarks/cse_client_bench.py --calls 200 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from googleapiclient.discovery import build
+
+from cse_client import AsyncCustomSearchClient
+from fake_cse import start_fake_cse
+
+
+def summarize(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 3)
+    }
+
+
+def bench_build_per_call(endpoint: str, calls: int) -> dict:
+    """The previous path: build() and a fresh connection for every search."""
+    startup = []
+    per_call = []
+    for i in range(calls):
+        t0 = time.perf_counter()
+        service = build("customsearch", "v1", developerKey="bench",
+                        client_options={"api_endpoint": endpoint})
+        t1 = time.perf_counter()
+        service.cse().list(q=f"dork {i}", cx="bench", num=5).execute()
+        t2 = time.perf_counter()
+        startup.append(t1 - t0)
+        per_call.append(t2 - t0)
+    return {
+        "startup": summarize(startup),
+        "per_call": summarize(per_call)
+    }
+
+
+async def bench_shared_client(endpoint: str, calls: int, concurrency: int) -> dict:
+    """The shared async client: one connection pool, calls issued sequentially and concurrently."""
+    t0 = time.perf_counter()
+    client = AsyncCustomSearchClient("bench", endpoint=endpoint)
+    startup = time.perf_counter() - t0
+
+    per_call = []
+    for i in range(calls):
+        t0 = time.perf_counter()
+        await client.list(q=f"dork {i}", cx="bench", num=5)
+        per_call.append(time.perf_counter() - t0)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            await client.list(q=f"concurrent dork {i}", cx="bench", num=5)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    wall = time.perf_counter() - t0
+    await client.aclose()
+    return {
+        "startup": {"once_ms": round(startup * 1000, 3)},
+        "per_call": summarize(per_call),
+        "concurrent": {"concurrency": concurrency, "calls_per_s": round(calls / wall, 1)}
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server, endpoint = start_fake_cse()
+    try:
+        report = {
+            "calls": args.calls,
+            "build_per_call": bench_build_per_call(endpoint, args.calls),
+            "shared_client": asyncio.run(bench_shared_client(endpoint, args.calls, args.concurrency))
+        }
+    finally:
+        server.shutdown()
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,159 @@
+"""
+Local stand-in for the Anthropic Messages API used by the benchmarks.
+
+Supports both plain and streaming (server-sent events) responses. The reply
+is a ```json fenced array of dorks built from the "User Query:" line of the
+prompt, streamed in small text deltas.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Tunables, overridable from the command line or by the benchmark driver
+CONFIG = {
+    "dorks": 6,
+    "chunk_chars": 12,
+    "chunk_delay": 0.01,
+    "latency": 0.0,
+    "jitter": 0.0,
+    "error_rate": 0.0,
+    "invalid_models": []
+}
+
+
+def fake_dorks(user_query: str, count: int) -> list[str]:
+    """Build deterministic dorks for a natural-language query."""
+    sites = ["linkedin.com/in", "twitter.com", "instagram.com", "github.com", "facebook.com", "medium.com"]
+    return [f'site:{sites[i % len(sites)]} "{user_query}" {i}' for i in range(count)]
+
+
+def reply_text(body: dict) -> str:
+    # Models listed in invalid_models answer with prose, exercising model escalation
+    if body.get("model") in CONFIG["invalid_models"]:
+        return "I could not come up with search queries for this request."
+    prompt = body["messages"][-1]["content"]
+    if isinstance(prompt, list):
+        prompt = "".join(block.get("text", "") for block in prompt)
+    numbered = re.findall(r"User Query (\d+):\s*(.+)", prompt)
+    if numbered:
+        reply = {n: fake_dorks(query.strip(), CONFIG["dorks"]) for n, query in numbered}
+    else:
+        match = re.search(r"User Query:\s*(.+)", prompt)
+        reply = fake_dorks(match.group(1).strip() if match else "query", CONFIG["dorks"])
+    return "```json\n" + json.dumps(reply, indent=2) + "\n```"
+
+
+class FakeAnthropicHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        body = json.loads(self.rfile.read(length))
+        text = reply_text(body)
+
+        time.sleep(max(0.0, CONFIG["latency"] + random.uniform(-CONFIG["jitter"], CONFIG["jitter"])))
+        if random.random() < CONFIG["error_rate"]:
+            self._send_json({
+                "type": "error",
+                "error": {"type": "overloaded_error", "message": "Overloaded"}
+            }, status=529)
+            return
+
+        if body.get("stream"):
+            self._stream(body, text)
+        else:
+            time.sleep(CONFIG["chunk_delay"] * (len(text) / CONFIG["chunk_chars"]))
+            self._send_json(self._message(body, text))
+
+    def _message(self, body: dict, text: str) -> dict:
+        return {
+            "id": "msg_fake",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "fake"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 1, "output_tokens": len(text)}
+        }
+
+    def _send_json(self, payload: dict, status: int = 200) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, body: dict, text: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        message = self._message(body, "")
+        message["content"] = []
+        message["stop_reason"] = None
+        self._event("message_start", {"type": "message_start", "message": message})
+        self._event("content_block_start", {
+            "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}
+        })
+        step = CONFIG["chunk_chars"]
+        for i in range(0, len(text), step):
+            time.sleep(CONFIG["chunk_delay"])
+            self._event("content_block_delta", {
+                "type": "content_block_delta", "index": 0,
+                "delta": {"type": "text_delta", "text": text[i:i + step]}
+            })
+        self._event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        self._event("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": len(text)}
+        })
+        self._event("message_stop", {"type": "message_stop"})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _event(self, name: str, payload: dict) -> None:
+        data = f"event: {name}\ndata: {json.dumps(payload)}\n\n".encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_anthropic(host: str = "127.0.0.1", port: int = 0) -> tuple[ThreadingHTTPServer, str]:
+    """Start the fake API on a background thread and return (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), FakeAnthropicHandler)
+    server.daemon_threads = True
+    t = threading.Thread(target=server.serve_forever)
+    t.daemon = True
+    t.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake Anthropic Messages API")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--dorks", type=int, default=CONFIG["dorks"])
+    parser.add_argument("--chunk-chars", type=int, default=CONFIG["chunk_chars"])
+    parser.add_argument("--chunk-delay", type=float, default=CONFIG["chunk_delay"])
+    parser.add_argument("--latency", type=float, default=CONFIG["latency"], help="Seconds before the first byte")
+    parser.add_argument("--jitter", type=float, default=CONFIG["jitter"], help="Uniform +/- seconds added to latency")
+    parser.add_argument("--error-rate", type=float, default=CONFIG["error_rate"], help="Fraction of requests failing with 529")
+    parser.add_argument("--invalid-model", action="append", default=[], help="Model that answers without dorks")
+    args = parser.parse_args()
+    CONFIG.update(dorks=args.dorks, chunk_chars=args.chunk_chars, chunk_delay=args.chunk_delay,
+                  latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                  invalid_models=args.invalid_model)
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FakeAnthropicHandler)
+    print(f"Fake Anthropic API listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
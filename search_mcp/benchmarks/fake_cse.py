@@ -0,0 +1,93 @@
+"""
+Local stand-in for the Google Custom Search JSON API used by the benchmarks.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Tunables, overridable from the command line or by the benchmark driver
+CONFIG = {
+    "total_results": 100,
+    "latency": 0.0,
+    "jitter": 0.0,
+    "error_rate": 0.0
+}
+
+
+def fake_items(query: str, start: int, num: int) -> list[dict]:
+    """Build deterministic result items for a query page."""
+    items = []
+    for rank in range(start, min(start + num, CONFIG["total_results"] + 1)):
+        items.append({
+            "title": f"Result {rank} for {query}",
+            "link": f"https://example.com/{zlib.crc32(query.encode('utf-8')) % 10000}/{rank}",
+            "snippet": f"Snippet {rank} matching {query}"
+        })
+    return items
+
+
+class FakeCSEHandler(BaseHTTPRequestHandler):
+    # Keep connections open between requests like the real API does
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        query = params.get("q", [""])[0]
+        num = int(params.get("num", ["10"])[0])
+        start = int(params.get("start", ["1"])[0])
+
+        time.sleep(max(0.0, CONFIG["latency"] + random.uniform(-CONFIG["jitter"], CONFIG["jitter"])))
+        if random.random() < CONFIG["error_rate"]:
+            status = 500
+            body = json.dumps({
+                "error": {"code": 500, "message": "Backend Error", "errors": [{"reason": "backendError"}]}
+            }).encode("utf-8")
+        else:
+            status = 200
+            body = json.dumps({
+                "kind": "customsearch#search",
+                "items": fake_items(query, start, num)
+            }).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_cse(host: str = "127.0.0.1", port: int = 0) -> tuple[ThreadingHTTPServer, str]:
+    """Start the fake API on a background thread and return (server, endpoint)."""
+    server = ThreadingHTTPServer((host, port), FakeCSEHandler)
+    server.daemon_threads = True
+    t = threading.Thread(target=server.serve_forever)
+    t.daemon = True
+    t.start()
+    return server, f"http://{host}:{server.server_address[1]}/"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake Custom Search API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--total-results", type=int, default=CONFIG["total_results"])
+    parser.add_argument("--latency", type=float, default=CONFIG["latency"], help="Seconds before each response")
+    parser.add_argument("--jitter", type=float, default=CONFIG["jitter"], help="Uniform +/- seconds added to latency")
+    parser.add_argument("--error-rate", type=float, default=CONFIG["error_rate"], help="Fraction of requests failing with 500")
+    args = parser.parse_args()
+    CONFIG.update(total_results=args.total_results, latency=args.latency, jitter=args.jitter,
+                  error_rate=args.error_rate)
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), FakeCSEHandler)
+    print(f"Fake Custom Search API listening on http://127.0.0.1:{args.port}/")
+    server.serve_forever()
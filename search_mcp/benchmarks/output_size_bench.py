@@ -0,0 +1,72 @@
+"""
+Measure response sizes for the search_mcp output formats.
+
+Builds a representative generate_google_dorks payload (6 dorks with 10
+results each, with title/snippet lengths typical of LinkedIn hits) and
+reports the encoded size of each output option against the default.
+
+Usage:
+    python benchmarks/output_size_bench.py --dorks 6 --results 10
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from output import format_results
+
+VARIANTS = {
+    "pretty": {},
+    "compact": {"output_format": "compact"},
+    "compact_snippet_80": {"output_format": "compact", "snippet_max_chars": 80},
+    "compact_title_link": {"output_format": "compact", "fields": ["title", "link"]},
+    "compact_links_only": {"output_format": "compact", "fields": ["link"]}
+}
+
+
+def sample_payload(dorks: int, results: int) -> dict:
+    payload = {}
+    for i in range(dorks):
+        data = []
+        for rank in range(results):
+            data.append({
+                "title": f"Jennifer Lee {rank} - Senior Software Engineer - Microsoft | LinkedIn",
+                "link": f"https://www.linkedin.com/in/jennifer-lee-{i}{rank:02d}a1b2c3",
+                "snippet": (
+                    "Senior Software Engineer at Microsoft · Experience: Microsoft · Education: "
+                    "University of Washington · Location: Seattle · 500+ connections on LinkedIn. "
+                    "View Jennifer Lee's profile on LinkedIn, a professional community of 1 billion members."
+                )
+            })
+        payload[f"query_{i+1}"] = {
+            "query": f'site:linkedin.com/in "Jennifer Lee" "Microsoft" {i}',
+            "results": {
+                "data": data,
+                "links": [item["link"] for item in data],
+                "quota_used": 1
+            }
+        }
+    payload["meta"] = {"quota_used": dorks, "generation": "rules"}
+    return payload
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dorks", type=int, default=6)
+    parser.add_argument("--results", type=int, default=10)
+    args = parser.parse_args()
+
+    payload = sample_payload(args.dorks, args.results)
+    baseline = len(format_results(payload).encode("utf-8"))
+    report = {}
+    for name, options in VARIANTS.items():
+        size = len(format_results(payload, **options).encode("utf-8"))
+        report[name] = {
+            "bytes": size,
+            "saved_bytes": baseline - size,
+            "saved_pct": round(100 * (baseline - size) / baseline, 1)
+        }
+    print(json.dumps(report, indent=2))
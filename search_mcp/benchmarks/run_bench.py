@@ -0,0 +1,145 @@
+"""
+Offline latency benchmark for the search_mcp pipeline.
+
+Starts local stand-ins for the Anthropic Messages API and the Custom Search
+API, points main.py at them and drives call_tool at several concurrency
+levels. Every call uses a distinct natural-language query so the caches do
+not hide the pipeline cost. Prints p50/p95/p99 latency and throughput per
+concurrency level as JSON.
+
+Usage:
+    python benchmarks/run_bench.py --calls 50 --concurrency 1,4,16 \\
+        --llm-latency 0.8 --cse-latency 0.3 --cse-jitter 0.2 --cse-error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import fake_anthropic
+import fake_cse
+from percentiles import percentile
+
+
+async def run_level(main, concurrency: int, calls: int, arguments: dict, run_id: str) -> dict:
+    """Issue `calls` tool calls with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    response_bytes = []
+    errors = 0
+
+    async def one(n: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            query = f"Find prospects for benchmark {run_id} level {concurrency} call {n}"
+            started = time.perf_counter()
+            try:
+                response = await main.call_tool("generate_google_dorks", {**arguments, "query": query})
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+            response_bytes.append(sum(len(content.text.encode("utf-8")) for content in response))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(n) for n in range(calls)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "calls": calls,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "throughput_per_s": round(len(latencies) / wall, 2) if wall else 0.0,
+        "avg_response_bytes": round(sum(response_bytes) / len(response_bytes)) if response_bytes else 0
+    }
+
+
+async def run(args) -> dict:
+    import main
+
+    main.DORK_STREAMING = args.streaming
+    main.DORK_RULES = args.rules
+    arguments = {"max_results": args.max_results, "output_format": args.output_format}
+
+    run_id = str(int(time.time()))
+    levels = []
+    try:
+        for concurrency in args.concurrency:
+            levels.append(await run_level(main, concurrency, args.calls, arguments, run_id))
+    finally:
+        await main.close_clients()
+    return {
+        "config": {
+            "streaming": args.streaming,
+            "rules": args.rules,
+            "max_results": args.max_results,
+            "output_format": args.output_format,
+            "fake_anthropic": dict(fake_anthropic.CONFIG),
+            "fake_cse": dict(fake_cse.CONFIG)
+        },
+        "levels": levels
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50, help="Tool calls per concurrency level")
+    parser.add_argument("--concurrency", type=lambda value: [int(v) for v in value.split(",")], default=[1, 4, 16])
+    parser.add_argument("--max-results", type=int, default=5)
+    parser.add_argument("--output-format", default="pretty")
+    parser.add_argument("--streaming", action="store_true", help="Use DORK_STREAMING mode")
+    parser.add_argument("--rules", action="store_true", help="Let the local dork compiler answer matching queries")
+    parser.add_argument("--dorks", type=int, default=6, help="Dorks returned by the fake model")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--llm-jitter", type=float, default=0.1)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-chunk-delay", type=float, default=0.01)
+    parser.add_argument("--cse-latency", type=float, default=0.3)
+    parser.add_argument("--cse-jitter", type=float, default=0.1)
+    parser.add_argument("--cse-error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    fake_anthropic.CONFIG.update(dorks=args.dorks, latency=args.llm_latency, jitter=args.llm_jitter,
+                                 error_rate=args.llm_error_rate, chunk_delay=args.llm_chunk_delay)
+    fake_cse.CONFIG.update(latency=args.cse_latency, jitter=args.cse_jitter, error_rate=args.cse_error_rate)
+    anthropic_server, anthropic_url = fake_anthropic.start_fake_anthropic()
+    cse_server, cse_url = fake_cse.start_fake_cse()
+
+    # main.py reads its configuration at import time
+    cache_dir = tempfile.mkdtemp(prefix="search-mcp-bench-")
+    os.environ.update({
+        "ANTHROPIC_API_KEY": "bench",
+        "GOOGLE_API_KEY": "bench",
+        "GOOGLE_CSE_ID": "bench",
+        "ANTHROPIC_BASE_URL": anthropic_url,
+        "GOOGLE_CSE_ENDPOINT": cse_url,
+        "SEARCH_CACHE_PATH": os.path.join(cache_dir, "bench_cache.db"),
+        "CSE_DAILY_QUOTA": "0",
+        "CSE_RATE_PER_SECOND": "100000",
+        "CSE_BURST": "100000"
+    })
+
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        anthropic_server.shutdown()
+        cse_server.shutdown()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
@@ -0,0 +1,161 @@
+"""
+Disk-backed caches for the search MCP server.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+logger = logging.getLogger("search-mcp")
+
+
+class SQLiteTTLCache:
+    """Key/value cache stored in SQLite with TTL expiry and LRU size eviction.
+
+    Values are stored as JSON. The connection is shared between threads and
+    guarded by a lock, so the cache can be used from the search worker pool.
+    """
+
+    def __init__(self, path: str, table: str = "cache", ttl: float = 86400, max_entries: int = 5000):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, "
+                "value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)")
+            self._conn.commit()
+
+    def get(self, key: str, allow_stale: bool = False) -> Any | None:
+        """Return the cached value for key, or None if it is missing or expired.
+
+        Expired entries are kept until they are evicted, so allow_stale=True
+        can still serve them when fresh data is unavailable.
+        """
+        entry = self.get_entry(key, allow_stale)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key: str, allow_stale: bool = False) -> tuple[Any, float] | None:
+        """Return (value, created_at) for key, or None if it is missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if not allow_stale and self.ttl > 0 and now - created_at > self.ttl:
+                self.misses += 1
+                return None
+
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(value), created_at
+
+    def set(self, key: str, value: Any) -> None:
+        """Store value under key and evict the least recently used entries over the size limit."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN "
+                    f"(SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            (size,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": size
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """In-memory LRU in front of a SQLiteTTLCache.
+
+    Lookups are served from memory when possible and fall back to disk; disk
+    hits are promoted into memory. Memory entries keep the creation time of
+    the disk entry so both tiers expire at the same moment.
+    """
+
+    def __init__(self, disk: SQLiteTTLCache, max_memory_entries: int = 256):
+        self.disk = disk
+        self.max_memory_entries = max_memory_entries
+        self.memory_hits = 0
+        self._memory: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value for key from memory or disk, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if self.disk.ttl <= 0 or now - created_at <= self.disk.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+        entry = self.disk.get_entry(key)
+        if entry is None:
+            return None
+        self._remember(key, entry)
+        return entry[0]
+
+    def set(self, key: str, value: Any) -> None:
+        """Store value in both tiers."""
+        self.disk.set(key, value)
+        self._remember(key, (value, time.time()))
+
+    def _remember(self, key: str, entry: tuple[Any, float]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Return per-tier hit counters plus the disk miss count."""
+        disk_stats = self.disk.stats()
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": disk_stats["hits"],
+            "misses": disk_stats["misses"],
+            "memory_size": len(self._memory),
+            "disk_size": disk_stats["size"]
+        }
@@ -0,0 +1,52 @@
+"""
+Long-lived async Google Custom Search client for the search MCP server.
+"""
+
+import logging
+
+import httpx
+
+logger = logging.getLogger("search-mcp")
+
+DEFAULT_ENDPOINT = "https://customsearch.googleapis.com/"
+
+
+class CustomSearchError(RuntimeError):
+    """Custom Search answered with an HTTP error status."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Custom Search request failed with HTTP {status_code}: {message}")
+        self.status_code = status_code
+
+
+class AsyncCustomSearchClient:
+    """Custom Search JSON API client sharing one pooled httpx.AsyncClient.
+
+    Keep-alive connections are reused by every concurrent search, so a
+    request only pays for TLS and TCP setup when the pool has no idle
+    connection left.
+    """
+
+    def __init__(self, api_key: str, endpoint: str | None = None, timeout: float = 10,
+                 max_connections: int = 20):
+        self._client = httpx.AsyncClient(
+            base_url=endpoint or DEFAULT_ENDPOINT,
+            params={"key": api_key},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    async def list(self, **params) -> dict:
+        """Run cse.list (GET customsearch/v1) with the given query parameters."""
+        response = await self._client.get("customsearch/v1", params=params)
+        if response.is_error:
+            try:
+                message = response.json()["error"]["message"]
+            except (ValueError, KeyError, TypeError):
+                message = response.text[:200]
+            raise CustomSearchError(response.status_code, message)
+        return response.json()
+
+    async def aclose(self) -> None:
+        """Close every pooled connection."""
+        await self._client.aclose()
@@ -0,0 +1,204 @@
+"""
+Near-duplicate clustering of search results by their title and snippet.
+
+Mirror pages, localized profile copies and reposts have different URLs but
+nearly the same text. Each result's title + snippet is shingled into word
+n-grams and summarized by a MinHash signature. One-permutation hashing
+(each shingle is hashed once and the hash picks its signature slot, with
+empty slots filled from their neighbours) keeps that linear in the number
+of shingles. Locality-sensitive hashing over bands of the signature finds
+candidate pairs without comparing every result with every other, so
+thousands of results cluster in a fraction of a second. Candidates whose
+estimated Jaccard similarity reaches the threshold are joined into one
+cluster.
+
+Profile results carry platform boilerplate ("View X's profile on
+LinkedIn, the world's largest professional community...") that would make
+different people look alike, so it is stripped before shingling, and two
+results whose links point at different profiles are never joined.
+"""
+
+import hashlib
+import re
+from collections import defaultdict
+
+from extract import profile_key
+
+# Estimated Jaccard similarity of the shingle sets at which two results are duplicates
+SIMILARITY_THRESHOLD = 0.6
+
+# Signature length and LSH banding; BANDS * ROWS must equal NUM_HASHES
+NUM_HASHES = 64
+BANDS = 16
+ROWS = 4
+
+# Words per shingle; shorter texts fall back to single words
+SHINGLE_WORDS = 2
+
+# LSH buckets with more members than this are skipped: they hold text shared
+# by many unrelated results, and comparing all their pairs is quadratic
+MAX_BUCKET_SIZE = 64
+
+# Text LinkedIn, Twitter/X and Instagram put in every profile's title or snippet
+_BOILERPLATE = re.compile("|".join([
+    r"View .{1,100}? profile on LinkedIn, the world.s largest professional community\.?",
+    r"[\w .'’-]{1,100}? has \d+\+? jobs? listed on (?:their|his|her) profile\.?",
+    r"See the complete profile on LinkedIn and discover .{1,100}? connections(?: and jobs at similar companies)?\.?",
+    r"\d+\+? connections on LinkedIn\.?",
+    r"Join (?:LinkedIn|to view profile)\b\.?",
+    r"\s*[|｜]\s*LinkedIn\b",
+    r"The latest (?:Tweets|posts) from .{1,100}?\(@\w{1,15}\)\.?",
+    r"\s*/\s*(?:X|Twitter)\s*$",
+    r"\bon (?:X|Twitter|Instagram)\s*:",
+    r"[\d.,]+[KkMm]? Followers, [\d.,]+[KkMm]? Following, [\d.,]+[KkMm]? Posts\s*[-–—]\s*"
+    r"See Instagram photos and videos from .{1,100}?\(@[\w.]{1,30}\)",
+    r"[•·]?\s*Instagram photos and videos",
+]), re.IGNORECASE | re.MULTILINE)
+
+# The top 6 bits of a 64-bit shingle hash pick one of the NUM_HASHES slots
+_SLOT_SHIFT = 58
+_VALUE_MASK = (1 << _SLOT_SHIFT) - 1
+
+_WORD = re.compile(r"\w+")
+
+
+def strip_boilerplate(text: str) -> str:
+    """Remove platform text that every profile result shares."""
+    return _BOILERPLATE.sub(" ", text)
+
+
+def _shingles(text: str) -> set[int]:
+    """64-bit hashes of the word n-grams of a text."""
+    words = _WORD.findall(strip_boilerplate(text).casefold())
+    if len(words) < SHINGLE_WORDS:
+        grams = words
+    else:
+        grams = [" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)]
+    return {
+        int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big")
+        for gram in grams
+    }
+
+
+def _signature(shingles: set[int]) -> tuple[int, ...]:
+    slots = [None] * NUM_HASHES
+    for shingle in shingles:
+        slot = shingle >> _SLOT_SHIFT
+        value = shingle & _VALUE_MASK
+        if slots[slot] is None or value < slots[slot]:
+            slots[slot] = value
+    # Densify: an empty slot takes the next filled slot's value, offset by the distance
+    signature = []
+    for slot in range(NUM_HASHES):
+        distance = 0
+        while slots[(slot + distance) % NUM_HASHES] is None:
+            distance += 1
+        signature.append(slots[(slot + distance) % NUM_HASHES] + (distance << _SLOT_SHIFT))
+    return tuple(signature)
+
+
+def _similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_HASHES
+
+
+def cluster_ids(items: list[dict], threshold: float = SIMILARITY_THRESHOLD) -> list[int]:
+    """Return, for each item, the index of the first item in its near-duplicate cluster.
+
+    A cluster never spans two different profiles (extract.profile_key of
+    the links), however similar their text.
+    """
+    parent = list(range(len(items)))
+    # The profile a cluster's links point at, kept on its root
+    keys = [profile_key(item.get("link", "")) for item in items]
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    signatures = []
+    for item in items:
+        shingles = _shingles(f"{item.get('title', '')}\n{item.get('snippet', '')}")
+        signatures.append(_signature(shingles) if shingles else None)
+
+    buckets: dict[tuple, list[int]] = defaultdict(list)
+    for i, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        for band in range(BANDS):
+            buckets[(band, signature[band * ROWS:(band + 1) * ROWS])].append(i)
+
+    for members in buckets.values():
+        if len(members) > MAX_BUCKET_SIZE:
+            continue
+        for j, other in enumerate(members):
+            for earlier in members[:j]:
+                root_earlier, root_other = find(earlier), find(other)
+                if root_earlier == root_other:
+                    continue
+                key_earlier, key_other = keys[root_earlier], keys[root_other]
+                if key_earlier and key_other and key_earlier != key_other:
+                    continue
+                if _similarity(signatures[earlier], signatures[other]) >= threshold:
+                    # The earlier item stays the representative
+                    root, merged = min(root_earlier, root_other), max(root_earlier, root_other)
+                    parent[merged] = root
+                    keys[root] = keys[root] or keys[merged]
+
+    return [find(i) for i in range(len(items))]
+
+
+def cluster_near_duplicates(items: list[dict], threshold: float = SIMILARITY_THRESHOLD) -> list[dict]:
+    """Keep the first item of every near-duplicate cluster, with cluster_size attached.
+
+    Items are expected best-first (by rank or score), so the representative
+    is the best-ranked copy. matched_dorks of merged records are combined.
+    """
+    roots = cluster_ids(items, threshold)
+    representatives: dict[int, dict] = {}
+    for i, root in enumerate(roots):
+        representative = representatives.get(root)
+        if representative is None:
+            representatives[root] = {**items[i], "cluster_size": 1}
+            continue
+        representative["cluster_size"] += 1
+        if "matched_dorks" in representative:
+            representative["matched_dorks"] = list(dict.fromkeys(
+                representative["matched_dorks"] + items[i].get("matched_dorks", [])
+            ))
+    return [representatives[root] for root in sorted(representatives)]
+
+
+def dedupe_results(results: dict, threshold: float = SIMILARITY_THRESHOLD) -> dict:
+    """Drop near-duplicates across the query_N entries of a tool response.
+
+    Results are visited in query_N then rank order, so a copy found by an
+    earlier dork is kept and later copies are removed from their dork's
+    data and links lists. The input is not modified.
+    """
+    keys = [key for key in results if key.startswith("query_")]
+    positions = [
+        (key, rank) for key in keys for rank in range(len(results[key]["results"].get("data", [])))
+    ]
+    items = [results[key]["results"]["data"][rank] for key, rank in positions]
+    roots = cluster_ids(items, threshold)
+
+    sizes = defaultdict(int)
+    for root in roots:
+        sizes[root] += 1
+
+    kept = defaultdict(list)
+    for i, ((key, _), root) in enumerate(zip(positions, roots)):
+        if root == i:
+            kept[key].append({**items[i], "cluster_size": sizes[root]})
+
+    deduped = dict(results)
+    for key in keys:
+        entry = results[key]
+        data = kept.get(key, [])
+        search_results = {**entry["results"], "data": data}
+        if "links" in search_results:
+            search_results["links"] = [item.get("link", "") for item in data]
+        deduped[key] = {**entry, "results": search_results}
+    return deduped
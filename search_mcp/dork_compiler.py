@@ -0,0 +1,142 @@
+"""
+Rule-based dork compiler for the common query shapes in DORKS_TEMPLATE.
+
+Queries such as "Find Jennifer Lee who works at Microsoft" or "Find software
+engineers at Google in Seattle" are compiled locally from slot-extraction
+patterns and the same site/operator combinations the template teaches the
+model. A subject is only compiled when it is clearly a person's name or a
+job title ending in a known role noun, so "Find hotels in Paris" or "Find
+job postings at Google" are not mistaken for profile searches. Anything
+that does not match a known shape returns None and is left to the model.
+"""
+
+import re
+
+# Sites searched for a person besides their LinkedIn profile
+OTHER_SOCIAL_SITES = "(site:twitter.com OR site:instagram.com)"
+
+_PREFIX = r"^(?:please\s+)?(?:find|search for|look for|look up|show me)\s+"
+_CITY = r"(?:\s+(?:who lives in|living in|based in|located in|in)\s+(?P<city>[^,]+?))?"
+
+# A person's name: two or three capitalized words
+_NAME = re.compile(r"^[A-Z][\w'.-]*(?:\s+[A-Z][\w'.-]*){1,2}$")
+
+# A role: up to four lowercase words such as "software engineers" or "data scientists"
+_ROLE = re.compile(r"^[a-z][a-z-]*(?:\s+[a-z][a-z-]*){0,3}$")
+
+# Head nouns of job titles (singular); a role's last word must be one of them
+ROLE_NOUNS = frozenset({
+    "accountant", "administrator", "advisor", "adviser", "analyst", "architect", "associate",
+    "attorney", "auditor", "banker", "biologist", "broker", "ceo", "cfo", "chemist", "cmo",
+    "co-founder", "cofounder", "consultant", "coo", "coordinator", "counsel", "cto", "dentist",
+    "designer", "developer", "director", "doctor", "economist", "editor", "engineer",
+    "entrepreneur", "executive", "founder", "intern", "investor", "journalist", "lawyer",
+    "lecturer", "manager", "marketer", "nurse", "officer", "paralegal", "partner", "pharmacist",
+    "photographer", "physician", "physicist", "president", "professor", "programmer",
+    "psychologist", "recruiter", "representative", "researcher", "scientist", "specialist",
+    "statistician", "strategist", "student", "supervisor", "teacher", "technician", "therapist",
+    "trader", "vp", "writer"
+})
+
+# Words that make a capitalized subject something other than a person's name
+_NOT_NAME_WORDS = frozenset({
+    "the", "a", "an", "all", "any", "some", "top", "best", "new", "recent", "latest", "local",
+    "senior", "junior", "lead", "head", "chief", "job", "posting", "post", "hotel", "restaurant",
+    "company", "event", "news", "article", "sale", "deal", "product", "people", "profile",
+    "influencer", "account", "photo", "video", "review", "blog", "startup"
+})
+
+# Words that never appear inside a job title
+_FUNCTION_WORDS = frozenset({
+    "about", "and", "by", "for", "from", "like", "of", "on", "or", "the", "to", "who", "with", "that"
+})
+
+_PATTERNS = [
+    ("school", re.compile(
+        _PREFIX + r"(?P<subject>.+?)\s+(?:who\s+)?(?:graduated from|went to|studied at|who studied at)\s+"
+        r"(?P<school>[^,]+?)" + _CITY + r"$", re.IGNORECASE)),
+    ("company", re.compile(
+        _PREFIX + r"(?P<subject>.+?)\s+(?:who\s+)?(?:works at|work at|working at|is working at|employed at|at)\s+"
+        r"(?P<company>[^,]+?)" + _CITY + r"$", re.IGNORECASE)),
+    ("city", re.compile(
+        _PREFIX + r"(?P<subject>.+?)\s+(?:who lives in|living in|based in|located in|in)\s+(?P<city>[^,]+?)$",
+        re.IGNORECASE)),
+]
+
+
+def _clean(query: str) -> str:
+    return " ".join(query.strip().rstrip("?.!").split())
+
+
+def _singular(role: str) -> str:
+    """'software engineers' -> 'software engineer' so the phrase matches profile headlines."""
+    words = role.split()
+    last = words[-1]
+    if last.endswith("ies"):
+        words[-1] = last[:-3] + "y"
+    elif last.endswith("s") and not last.endswith("ss"):
+        words[-1] = last[:-1]
+    return " ".join(words)
+
+
+def _is_name(subject: str) -> bool:
+    """Two or three capitalized words, none of them a role noun or a common non-name word."""
+    if not _NAME.match(subject):
+        return False
+    return not any(
+        word in ROLE_NOUNS or word in _NOT_NAME_WORDS
+        for word in (_singular(word) for word in subject.lower().split())
+    )
+
+
+def _is_role(subject: str) -> bool:
+    """Lowercase words ending in a role noun, e.g. "software engineers" or "product managers"."""
+    if not _ROLE.match(subject):
+        return False
+    words = _singular(subject).split()
+    return words[-1] in ROLE_NOUNS and not any(word in _FUNCTION_WORDS for word in words)
+
+
+def _person_dorks(name: str, detail: str | None, city: str | None) -> list[str]:
+    """A LinkedIn profile search and a name-in-title search on Twitter and Instagram.
+
+    The second dork differs in its terms, not just its sites, so the dork
+    planner neither drops nor merges it: it finds profiles whose display
+    name is the person's even when the bio lacks the exact phrase.
+    """
+    terms = " ".join(f'"{term}"' for term in (detail, city) if term)
+    return [
+        f'site:linkedin.com/in "{name}" {terms}'.rstrip(),
+        f'{OTHER_SOCIAL_SITES} intitle:"{name}" {terms}'.rstrip()
+    ]
+
+
+def _role_dorks(role: str, detail: str | None, city: str | None) -> list[str]:
+    terms = " ".join(f'"{term}"' for term in (role, detail, city) if term)
+    return [
+        f'site:linkedin.com/in {terms}',
+        f'site:twitter.com {terms}'
+    ]
+
+
+def compile_dorks(query: str) -> list[str] | None:
+    """Compile a natural-language query into dorks, or return None if no rule matches."""
+    text = _clean(query)
+    for shape, pattern in _PATTERNS:
+        match = pattern.match(text)
+        if match is None:
+            continue
+
+        subject = match.group("subject")
+        city = match.groupdict().get("city")
+        detail = match.groupdict().get("school") or match.groupdict().get("company")
+
+        if _is_name(subject):
+            return _person_dorks(subject, detail, city)
+
+        if _is_role(subject):
+            return _role_dorks(_singular(subject), detail, city)
+
+        # The subject is neither a name nor a known role; leave it to the model
+        return None
+    return None
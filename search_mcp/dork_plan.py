@@ -0,0 +1,233 @@
+"""
+Dork set planning: canonicalize generated dorks and prune the redundant ones.
+
+Each dork is parsed into a small operator AST and flattened into disjunctive
+normal form, a set of alternatives where every alternative is a set of
+terms that must all match. Two dorks with the same normal form search for
+the same thing however they are quoted or ordered, and a dork whose
+alternatives are all alternatives of another dork only finds a subset of
+its results. Dorks that differ only in their site: alternatives are merged
+into one (site:a OR site:b) group when the result fits Google's query
+length limit.
+
+Like Google, OR binds tighter than the implicit AND between terms, so
+`site:a "x" OR site:b "x"` means site:a AND ("x" OR site:b) AND "x".
+"""
+
+import re
+
+# Google ignores everything after the 32nd word of a query
+MAX_QUERY_WORDS = 32
+
+# Dorks whose normal form would have more alternatives than this are left as they are
+MAX_ALTERNATIVES = 64
+
+_TOKEN = re.compile(r'\(|\)|\||-?(?:[A-Za-z]+:)?"[^"]*"?|-?[^\s()"|]+')
+
+# A term is (negated, operator, value); operator is "" for plain words and phrases
+Term = tuple[bool, str, str]
+Alternatives = frozenset[frozenset[Term]]
+
+
+def _term(token: str) -> Term:
+    negated = token.startswith("-") and len(token) > 1
+    if negated:
+        token = token[1:]
+    operator, _, value = token.partition(":")
+    if not value or operator.startswith('"'):
+        operator, value = "", token
+    operator = operator.lower()
+    value = " ".join(value.strip('"').casefold().split())
+    if operator == "site":
+        value = re.sub(r"^(?:https?://)?(?:www\.)?", "", value).rstrip("/")
+    return negated, operator, value
+
+
+class _Parser:
+    """Recursive descent over the token list, recording the source text of every term."""
+
+    def __init__(self, dork: str):
+        self.tokens = _TOKEN.findall(dork)
+        self.position = 0
+        self.text: dict[Term, str] = {}
+
+    def peek(self) -> str | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def parse(self) -> Alternatives:
+        alternatives = self.conjunction()
+        if self.peek() is not None:
+            raise ValueError("unbalanced parentheses")
+        return alternatives
+
+    def conjunction(self) -> Alternatives:
+        alternatives = frozenset([frozenset()])
+        while self.peek() not in (None, ")"):
+            part = self.disjunction()
+            alternatives = _absorb(frozenset(a | b for a in alternatives for b in part))
+            if len(alternatives) > MAX_ALTERNATIVES:
+                raise ValueError("too many alternatives")
+        return alternatives
+
+    def disjunction(self) -> Alternatives:
+        alternatives = self.unit()
+        while self.peek() in ("OR", "|"):
+            self.position += 1
+            if self.peek() in (None, ")"):
+                break
+            alternatives = _absorb(alternatives | self.unit())
+        return alternatives
+
+    def unit(self) -> Alternatives:
+        token = self.tokens[self.position]
+        self.position += 1
+        if token == "(":
+            alternatives = self.conjunction()
+            if self.peek() != ")":
+                raise ValueError("unbalanced parentheses")
+            self.position += 1
+            return alternatives
+        if token in ("OR", "|"):
+            raise ValueError("OR without a left operand")
+        term = _term(token)
+        self.text.setdefault(term, token)
+        return frozenset([frozenset([term])])
+
+
+def _absorb(alternatives: Alternatives) -> Alternatives:
+    """Drop alternatives that are stricter versions of another alternative."""
+    return frozenset(a for a in alternatives if not any(b < a for b in alternatives))
+
+
+def parse_dork(dork: str) -> tuple[Alternatives, dict[Term, str]] | None:
+    """Return the normal form of a dork and the source text of its terms, or None if it cannot be parsed."""
+    parser = _Parser(dork)
+    try:
+        return parser.parse(), parser.text
+    except (ValueError, IndexError):
+        return None
+
+
+def _site_factored(alternatives: Alternatives) -> tuple[frozenset[Term], list[Term]] | None:
+    """Split a dork of the form (site:a OR site:b ...) terms into (terms, sites)."""
+    rest = None
+    sites = []
+    for alternative in alternatives:
+        positive_sites = [term for term in alternative if term[1] == "site" and not term[0]]
+        if len(positive_sites) != 1:
+            return None
+        if rest is None:
+            rest = alternative - {positive_sites[0]}
+        elif alternative - {positive_sites[0]} != rest:
+            return None
+        sites.append(positive_sites[0])
+    if rest is None:
+        return None
+    return rest, sites
+
+
+def _word_count(dork: str) -> int:
+    return len(dork.replace("(", " ").replace(")", " ").split())
+
+
+def _render(sites: list[Term], rest: list[str], text: dict[Term, str]) -> str:
+    site_text = [text[site] for site in sites]
+    group = site_text[0] if len(site_text) == 1 else "(" + " OR ".join(site_text) + ")"
+    return " ".join([group, *rest])
+
+
+def plan_dorks(dorks: list[str], max_words: int = MAX_QUERY_WORDS) -> tuple[list[str], dict]:
+    """Return the dorks worth searching and counts of what was pruned.
+
+    Duplicates and subsumed dorks are dropped, dorks that only differ in
+    their site: alternatives are merged, and everything else is kept in its
+    original order and wording.
+    """
+    parsed = [parse_dork(dork) for dork in dorks]
+    stats = {"generated": len(dorks), "duplicates": 0, "subsumed": 0, "merged": 0}
+
+    # Step 1: Drop dorks whose alternatives are all covered by another dork
+    kept = []
+    for i, entry in enumerate(parsed):
+        text_key = " ".join(dorks[i].split())
+        redundant = None
+        for j, other in enumerate(parsed):
+            if i == j:
+                continue
+            if entry is None or other is None:
+                if j < i and other is None and " ".join(dorks[j].split()) == text_key:
+                    redundant = "duplicates"
+                continue
+            if entry[0] == other[0]:
+                if j < i:
+                    redundant = "duplicates"
+            elif entry[0] < other[0]:
+                redundant = "subsumed"
+            if redundant:
+                break
+        if redundant:
+            stats[redundant] += 1
+        else:
+            kept.append(i)
+
+    # Step 2: Merge dorks that share everything but their site: alternatives
+    groups: dict[frozenset[Term], list[int]] = {}
+    factored = {}
+    for i in kept:
+        if parsed[i] is not None and (split := _site_factored(parsed[i][0])) is not None:
+            factored[i] = split
+            groups.setdefault(split[0], []).append(i)
+
+    planned = {}
+    for i in kept:
+        if i not in factored:
+            planned[i] = [dorks[i]]
+            continue
+        members = groups[factored[i][0]]
+        if members[0] != i:
+            continue
+        if len(members) == 1:
+            planned[i] = [dorks[i]]
+            continue
+
+        text = {}
+        for member in members:
+            text = {**parsed[member][1], **text}
+        rest_terms = factored[i][0]
+        rest = [text[term] for term in parsed[i][1] if term in rest_terms]
+        sites = list(dict.fromkeys(site for member in members for site in factored[member][1]))
+
+        # Pack the site alternatives into as few dorks as fit the length limit
+        merged = []
+        chunk = []
+        for site in sites:
+            if chunk and _word_count(_render(chunk + [site], rest, text)) > max_words:
+                merged.append(_render(chunk, rest, text))
+                chunk = []
+            chunk.append(site)
+        merged.append(_render(chunk, rest, text))
+
+        if len(merged) < len(members):
+            planned[i] = merged
+            stats["merged"] += len(members) - len(merged)
+        else:
+            for member in members:
+                planned[member] = [dorks[member]]
+
+    result = [dork for i in sorted(planned) for dork in planned[i]]
+    stats["planned"] = len(result)
+    return result, stats
+
+
+def is_covered(dork: str, earlier: list[str]) -> bool:
+    """True if every result of dork would also be found by one of the earlier dorks."""
+    entry = parse_dork(dork)
+    for other in earlier:
+        if entry is None:
+            if " ".join(other.split()) == " ".join(dork.split()):
+                return True
+            continue
+        other_entry = parse_dork(other)
+        if other_entry is not None and entry[0] <= other_entry[0]:
+            return True
+    return False
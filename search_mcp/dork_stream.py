@@ -0,0 +1,91 @@
+"""
+Incremental extraction of dorks from a streamed model response.
+"""
+
+import json
+
+FENCE = "```json"
+
+
+class DorkStreamParser:
+    """Pull complete dork strings out of a JSON array as it streams in.
+
+    The array is found the way parse_dorks finds it: after a ```json fence
+    when the response has one, otherwise at the start of the response. Each
+    string element of the array is reported as soon as its closing quote
+    arrives. Nested values and responses whose JSON is not an array yield
+    no dorks, since the non-streaming validator would reject them too.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._fenced = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+
+    def feed(self, chunk: str) -> list[str]:
+        """Consume the next chunk of text and return the dorks completed by it."""
+        self.text += chunk
+        if not self._started and not self._find_start():
+            return []
+        found = []
+        while self._pos < len(self.text) and not self.done:
+            ch = self.text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        dork = self._decode(self.text[self._string_start:self._pos + 1])
+                        if dork:
+                            found.append(dork)
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch in "[{":
+                self._depth += 1
+            elif ch in "]}":
+                self._depth -= 1
+                if not self._depth:
+                    self.done = True
+            self._pos += 1
+        return found
+
+    def _find_start(self) -> bool:
+        """Move to the opening '[' of the array; return False while more text is needed."""
+        if not self._fenced:
+            fence = self.text.find(FENCE, self._pos)
+            if fence >= 0:
+                self._fenced = True
+                self._pos = fence + len(FENCE)
+            elif self.text.lstrip().startswith("["):
+                self._pos = len(self.text) - len(self.text.lstrip())
+            else:
+                # Wait for a fence, keeping one split across chunks in view
+                self._pos = max(self._pos, len(self.text) - len(FENCE) + 1)
+                return False
+        rest = self.text[self._pos:].lstrip()
+        if not rest:
+            return False
+        self._pos = len(self.text) - len(rest)
+        if rest[0] != "[":
+            self.done = True
+            return False
+        self._started = True
+        return True
+
+    @staticmethod
+    def _decode(literal: str) -> str | None:
+        try:
+            value = json.loads(literal)
+        except ValueError:
+            return None
+        return value.strip() or None
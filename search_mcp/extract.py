@@ -0,0 +1,187 @@
+"""
+LLM-free extraction of person/profile records from search results.
+
+Titles and snippets returned by Custom Search for the LinkedIn, Twitter/X
+and Instagram URL shapes the dorks target follow stable patterns, e.g.
+"Jennifer Lee - Senior Software Engineer - Microsoft | LinkedIn" or
+"Jessica Martinez (@jmartinez) / X". Those are parsed with precompiled
+regexes into typed records so agents do not need a model call per result.
+"""
+
+import re
+from typing import TypedDict
+
+
+class ProfileRecord(TypedDict, total=False):
+    platform: str
+    kind: str
+    profile_url: str
+    source_link: str
+    handle: str
+    name: str
+    headline: str
+    company: str
+    location: str
+    education: str
+
+
+# One pass over the URL classifies the platform and pulls out the handle
+_URL = re.compile(
+    r"^https?://(?:[a-z]{2,3}\.|www\.|mobile\.|m\.)*(?:"
+    r"(?P<linkedin>linkedin\.com)/in/(?P<linkedin_handle>[^/?#]+)"
+    r"|(?P<twitter>twitter\.com|x\.com)/(?P<twitter_handle>\w{1,15})(?P<twitter_status>/status/\d+)?"
+    r"|(?P<instagram>instagram\.com)/(?:(?P<instagram_post>p|reel)/[^/?#]+|(?P<instagram_handle>[\w.]{1,30}))"
+    r")(?:[/?#]|$)",
+    re.IGNORECASE
+)
+
+# Paths on twitter.com and instagram.com that look like handles but are not profiles
+_RESERVED_HANDLES = {
+    "home", "search", "explore", "hashtag", "i", "intent", "share", "login", "signup",
+    "settings", "messages", "notifications", "about", "accounts", "directory", "tags", "stories"
+}
+
+_LINKEDIN_SUFFIX = re.compile(r"\s*[|｜]\s*LinkedIn.*$", re.IGNORECASE)
+_TITLE_SEPARATOR = re.compile(r"\s+[-–—]\s+")
+_AT_COMPANY = re.compile(r"^(?P<headline>.+?)\s+(?:at|@)\s+(?P<company>.+)$")
+_SNIPPET_FIELD = re.compile(r"\b(?P<field>Location|Experience|Education)\s*:\s*(?P<value>[^·|\n]+?)\s*(?=·|\||\n|$)")
+_SNIPPET_PLACE = re.compile(r"^(?P<place>[A-Z][\w .'-]+(?:,\s*[A-Z][\w .'-]+){1,2})\s*·")
+_HANDLE_TITLE = re.compile(r"^(?P<name>.*?)\s*\(@(?P<handle>[\w.]{1,30})\)")
+
+
+def _linkedin(title: str, snippet: str) -> dict:
+    record = {}
+    parts = _TITLE_SEPARATOR.split(_LINKEDIN_SUFFIX.sub("", title).strip())
+    if parts and parts[0]:
+        record["name"] = parts[0]
+    if len(parts) >= 3:
+        record["headline"] = parts[1]
+        record["company"] = parts[2]
+    elif len(parts) == 2:
+        at_company = _AT_COMPANY.match(parts[1])
+        if at_company:
+            record["headline"] = at_company.group("headline")
+            record["company"] = at_company.group("company")
+        else:
+            record["headline"] = parts[1]
+
+    for match in _SNIPPET_FIELD.finditer(snippet):
+        field = match.group("field").lower()
+        value = match.group("value").strip()
+        if field == "location":
+            record["location"] = value
+        elif field == "experience":
+            record.setdefault("company", value)
+        else:
+            record["education"] = value
+    if "location" not in record:
+        place = _SNIPPET_PLACE.match(snippet)
+        if place:
+            record["location"] = place.group("place").strip()
+    return record
+
+
+def _handle_title(title: str) -> dict:
+    match = _HANDLE_TITLE.match(title)
+    if match is None:
+        return {}
+    record = {"handle": match.group("handle")}
+    if match.group("name"):
+        record["name"] = match.group("name")
+    return record
+
+
+def extract_profile(item: dict) -> ProfileRecord | None:
+    """Parse one title/link/snippet result into a profile record, or None for other URLs."""
+    link = item.get("link", "")
+    match = _URL.match(link)
+    if match is None:
+        return None
+    title = item.get("title", "")
+    snippet = item.get("snippet", "")
+
+    if match.group("linkedin"):
+        handle = match.group("linkedin_handle")
+        record = {
+            "platform": "linkedin",
+            "kind": "profile",
+            "profile_url": f"https://www.linkedin.com/in/{handle}",
+            "handle": handle,
+            **_linkedin(title, snippet)
+        }
+    elif match.group("twitter"):
+        handle = match.group("twitter_handle")
+        if handle.lower() in _RESERVED_HANDLES:
+            return None
+        record = {
+            "platform": "twitter",
+            "kind": "post" if match.group("twitter_status") else "profile",
+            "profile_url": f"https://twitter.com/{handle}",
+            "handle": handle,
+            **_handle_title(title)
+        }
+    else:
+        record = {
+            "platform": "instagram",
+            "kind": "post" if match.group("instagram_post") else "profile",
+            **_handle_title(title)
+        }
+        handle = match.group("instagram_handle") or record.get("handle")
+        if handle is None or handle.lower() in _RESERVED_HANDLES:
+            return None
+        record["handle"] = handle
+        record["profile_url"] = f"https://www.instagram.com/{handle}"
+
+    record["source_link"] = link
+    return record
+
+
+def profile_key(link: str) -> tuple[str, str] | None:
+    """(platform, lower-cased handle) of a LinkedIn, Twitter/X or Instagram profile URL, else None.
+
+    Twitter/X status URLs map to their author. Localized and mobile hosts
+    (de.linkedin.com, mobile.twitter.com, x.com) share the key of the
+    canonical profile.
+    """
+    match = _URL.match(link)
+    if match is None:
+        return None
+    if match.group("linkedin"):
+        return "linkedin", match.group("linkedin_handle").lower()
+    if match.group("twitter"):
+        handle = match.group("twitter_handle").lower()
+        return None if handle in _RESERVED_HANDLES else ("twitter", handle)
+    handle = match.group("instagram_handle")
+    if handle is None or handle.lower() in _RESERVED_HANDLES:
+        return None
+    return "instagram", handle.lower()
+
+
+def extract_profiles(items: list[dict]) -> list[ProfileRecord]:
+    """Extract profile records for a whole result set, one record per profile URL.
+
+    When several results point at the same profile, fields missing from the
+    first record are filled in from later ones.
+    """
+    profiles: dict[str, ProfileRecord] = {}
+    for item in items:
+        record = extract_profile(item)
+        if record is None:
+            continue
+        key = record["profile_url"].lower()
+        existing = profiles.get(key)
+        if existing is None:
+            profiles[key] = record
+        else:
+            for field, value in record.items():
+                existing.setdefault(field, value)
+    return list(profiles.values())
+
+
+def result_items(results: dict) -> list[dict]:
+    """All search result items under the query_N entries of a tool response."""
+    return [
+        item
+        for key, entry in results.items() if key.startswith("query_")
+        for item in entry["results"].get("data", [])
+    ]
@@ -0,0 +1,127 @@
+"""
+Hedged requests: send a backup copy of a slow request and use whichever answers first.
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from percentiles import percentile
+
+
+class Hedger:
+    """Issues a duplicate request once the first one is slower than most recent requests.
+
+    The hedge delay is the given percentile of recently observed latencies,
+    so only the slowest few percent of requests are duplicated. Hedging
+    stays off until min_samples latencies have been seen, and the number of
+    backups is capped at max_ratio of the primary requests so the extra
+    quota spent is bounded.
+    """
+
+    def __init__(self, percentile: float = 95, max_ratio: float = 0.1, min_samples: int = 20,
+                 window: int = 512):
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+        self.primaries = 0
+        self.hedges = 0
+        self.wins = 0
+        # Backups decided on but still waiting in acquire(), counted against the budget
+        self._reserved = 0
+        self._latencies = deque(maxlen=window)
+
+    def delay(self) -> float | None:
+        """Seconds to wait before hedging, or None while there are too few samples."""
+        if len(self._latencies) < self.min_samples:
+            return None
+        return percentile(sorted(self._latencies), self.percentile)
+
+    def _within_budget(self) -> bool:
+        return self.hedges + self._reserved < self.max_ratio * self.primaries
+
+    async def run(self, fn: Callable[[], Awaitable[dict]],
+                  acquire: Callable[[], Awaitable[None]]) -> tuple[dict, int]:
+        """Run fn, hedging it with a second call if it is slow.
+
+        fn returns a result dict, with an "error" key on failure. acquire is
+        awaited before the backup is sent (e.g. to take quota) and may raise
+        to veto it. Returns the first successful result and the number of
+        backup requests sent (0 or 1).
+        """
+        self.primaries += 1
+        started = time.monotonic()
+        primary = asyncio.ensure_future(fn())
+        delay = self.delay()
+        if delay is not None:
+            await asyncio.wait({primary}, timeout=delay)
+        if primary.done() or delay is None or not self._within_budget():
+            result = await primary
+            self._record(started, result)
+            return result, 0
+
+        # Reserve the hedge now, so concurrent slow requests cannot all pass the budget check
+        sent = False
+        reserved = True
+        self._reserved += 1
+
+        def release() -> None:
+            nonlocal reserved
+            if reserved:
+                reserved = False
+                self._reserved -= 1
+
+        async def backup_call() -> dict:
+            nonlocal sent
+            try:
+                await acquire()
+            finally:
+                release()
+            sent = True
+            self.hedges += 1
+            return await fn()
+
+        backup = asyncio.ensure_future(backup_call())
+        # A backup cancelled before it starts never reaches its finally block
+        backup.add_done_callback(lambda _: release())
+        pending = {primary, backup}
+        fallback = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Prefer the primary when both finish in the same step
+                for task in sorted(done, key=lambda task: task is not primary):
+                    if task.exception() is not None:
+                        if task is primary:
+                            raise task.exception()
+                        continue
+                    result = task.result()
+                    if "error" in result and pending:
+                        fallback = result
+                        continue
+                    if task is backup:
+                        self.wins += 1
+                    self._record(started, result)
+                    return result, int(sent)
+        finally:
+            for task in pending:
+                task.cancel()
+        return fallback, int(sent)
+
+    def _record(self, started: float, result: Any) -> None:
+        if "error" not in result:
+            self._latencies.append(time.monotonic() - started)
+
+    def stats(self) -> dict:
+        delay = self.delay()
+        return {
+            "percentile": self.percentile,
+            "delay_ms": round(delay * 1000, 1) if delay is not None else None,
+            "primaries": self.primaries,
+            "hedges": self.hedges,
+            "hedge_rate": round(self.hedges / self.primaries, 4) if self.primaries else 0.0,
+            "wins": self.wins,
+            "win_rate": round(self.wins / self.hedges, 4) if self.hedges else 0.0
+        }
@@ -1,16 +1,32 @@
+import asyncio
 import logging
 import os
-from collections.abc import Sequence
+import re
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 import anthropic
 import json
-from googleapiclient.discovery import build
 from mcp.server import Server
 from mcp.types import (
     Tool,
     TextContent,
 )
 from dotenv import load_dotenv
+from cache import SQLiteTTLCache, TieredCache
+from cse_client import AsyncCustomSearchClient
+from dedupe import cluster_near_duplicates, dedupe_results
+from dork_compiler import compile_dorks
+from dork_plan import is_covered, plan_dorks
+from dork_stream import DorkStreamParser
+from hedging import Hedger
+from extract import extract_profiles, result_items
+from merge import merge_results
+from output import OUTPUT_FORMATS, RESULT_FIELDS, format_results
+from routing import ModelRouter, ModelTier
+from quota import PRIORITIES, PRIORITY_INTERACTIVE, QuotaExhausted, QuotaScheduler
+from singleflight import SingleFlight
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +37,117 @@ ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY")
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
 GOOGLE_CSE_ID = os.environ.get("GOOGLE_CSE_ID")
 
+# Optional override of the Anthropic API endpoint, e.g. a local stand-in server
+ANTHROPIC_BASE_URL = os.environ.get("ANTHROPIC_BASE_URL") or None
+
+# Model used to turn natural-language queries into dorks
+DORK_MODEL = os.environ.get("DORK_MODEL", "claude-3-opus-20240229")
+DORK_MAX_TOKENS = int(os.environ.get("DORK_MAX_TOKENS", "4096"))
+
+# Fast model tried first under a tight token budget; DORK_MODEL is only called when its
+# output fails validation. An empty DORK_FAST_MODEL always uses DORK_MODEL.
+DORK_FAST_MODEL = os.environ.get("DORK_FAST_MODEL", "claude-3-haiku-20240307")
+DORK_FAST_MAX_TOKENS = int(os.environ.get("DORK_FAST_MAX_TOKENS", "1024"))
+
+# Fast-model answers with fewer dorks than this are treated as low confidence
+DORK_MIN_DORKS = int(os.environ.get("DORK_MIN_DORKS", "2"))
+
+model_router = ModelRouter(
+    ([ModelTier("fast", DORK_FAST_MODEL, DORK_FAST_MAX_TOKENS)] if DORK_FAST_MODEL else [])
+    + [ModelTier("large", DORK_MODEL, DORK_MAX_TOKENS)]
+)
+
+# Compile common query shapes locally instead of asking the model
+DORK_RULES = os.environ.get("DORK_RULES", "true").lower() in ("1", "true", "yes")
+
+# Drop duplicate and subsumed dorks and merge site: alternatives before searching
+DORK_PLANNING = os.environ.get("DORK_PLANNING", "true").lower() in ("1", "true", "yes")
+
+# Natural-language queries packed into one model call by generate_google_dorks_batch, and
+# the output token ceiling of one such call (4096 is the Claude 3 models' output limit)
+BATCH_QUERIES_PER_CALL = max(1, int(os.environ.get("BATCH_QUERIES_PER_CALL", "10")))
+BATCH_MAX_TOKENS = int(os.environ.get("BATCH_MAX_TOKENS", "4096"))
+
+# Stream the model response and start searching each dork as soon as it is complete
+DORK_STREAMING = os.environ.get("DORK_STREAMING", "false").lower() in ("1", "true", "yes")
+
+# Optional override of the Custom Search endpoint, e.g. a local stand-in server
+GOOGLE_CSE_ENDPOINT = os.environ.get("GOOGLE_CSE_ENDPOINT")
+
+# Maximum number of dork searches running at the same time
+SEARCH_CONCURRENCY = max(1, int(os.environ.get("SEARCH_CONCURRENCY", "6")))
+
+# Custom Search returns at most 10 results per request and 100 per query
+CSE_PAGE_SIZE = 10
+CSE_MAX_RESULTS = 100
+
+# Pooled Custom Search connections shared by all concurrent tool calls
+CSE_MAX_CONNECTIONS = max(1, int(os.environ.get("CSE_MAX_CONNECTIONS", "20")))
+
+# Hedge slow Custom Search requests with a duplicate once they pass this percentile of
+# recent latencies; hedges are capped at a fraction of the primary requests
+CSE_HEDGING = os.environ.get("CSE_HEDGING", "false").lower() in ("1", "true", "yes")
+CSE_HEDGE_PERCENTILE = float(os.environ.get("CSE_HEDGE_PERCENTILE", "95"))
+CSE_HEDGE_MAX_RATIO = float(os.environ.get("CSE_HEDGE_MAX_RATIO", "0.1"))
+CSE_HEDGE_MIN_SAMPLES = int(os.environ.get("CSE_HEDGE_MIN_SAMPLES", "20"))
+
+cse_hedger = Hedger(
+    percentile=CSE_HEDGE_PERCENTILE,
+    max_ratio=CSE_HEDGE_MAX_RATIO,
+    min_samples=CSE_HEDGE_MIN_SAMPLES
+)
+
+# Worker threads for the SQLite search cache, kept off the event loop
+search_executor = ThreadPoolExecutor(max_workers=SEARCH_CONCURRENCY, thread_name_prefix="search-cache")
+
+# Persistent cache of Custom Search results, keyed by normalized dork and page size
+SEARCH_CACHE_PATH = os.environ.get(
+    "SEARCH_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "search_cache.db")
+)
+SEARCH_CACHE_TTL = float(os.environ.get("SEARCH_CACHE_TTL", "86400"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+
+search_cache = SQLiteTTLCache(
+    SEARCH_CACHE_PATH,
+    table="search_results",
+    ttl=SEARCH_CACHE_TTL,
+    max_entries=SEARCH_CACHE_MAX_ENTRIES
+)
+
+# Custom Search budget: daily request quota and per-second rate limit (0 for unlimited)
+CSE_DAILY_QUOTA = int(os.environ.get("CSE_DAILY_QUOTA", "100"))
+CSE_RATE_PER_SECOND = float(os.environ.get("CSE_RATE_PER_SECOND", "1.5"))
+CSE_BURST = int(os.environ.get("CSE_BURST", "10"))
+
+quota_scheduler = QuotaScheduler(
+    SEARCH_CACHE_PATH,
+    daily_limit=CSE_DAILY_QUOTA,
+    rate_per_second=CSE_RATE_PER_SECOND,
+    burst=CSE_BURST
+)
+
+# Identical concurrent model generations and Custom Search pages share one in-flight call
+generation_flight = SingleFlight()
+search_flight = SingleFlight()
+# Progress of each in-flight streamed generation, shared with the callers coalesced onto it
+stream_progress: dict[str, "ProgressFanout"] = {}
+
+# Cache of generated dorks keyed by the normalized natural-language query
+GENERATION_CACHE_TTL = float(os.environ.get("GENERATION_CACHE_TTL", "604800"))
+GENERATION_CACHE_MAX_ENTRIES = int(os.environ.get("GENERATION_CACHE_MAX_ENTRIES", "2000"))
+GENERATION_CACHE_MEMORY_ENTRIES = int(os.environ.get("GENERATION_CACHE_MEMORY_ENTRIES", "256"))
+
+generation_cache = TieredCache(
+    SQLiteTTLCache(
+        SEARCH_CACHE_PATH,
+        table="dork_generations",
+        ttl=GENERATION_CACHE_TTL,
+        max_entries=GENERATION_CACHE_MAX_ENTRIES
+    ),
+    max_memory_entries=GENERATION_CACHE_MEMORY_ENTRIES
+)
+
 DORKS_TEMPLATE = """
 # Google Dork Syntax Quick Reference
 # ===============================
@@ -346,8 +473,48 @@ User Query: {query}
 Return ONLY the JSON with dorks, nothing else.
 """
 
+# The reference part of DORKS_TEMPLATE, reused for prompts covering several queries
+DORKS_REFERENCE = DORKS_TEMPLATE.split("now following is the user query")[0]
+
+BATCH_DORKS_TEMPLATE = DORKS_REFERENCE + """now following are several numbered user queries. convert each one to dorks and give me only a JSON object mapping each query number to its JSON array of dorks, nothing else:
+
+{queries}
+
+Return ONLY the JSON object, for example {"1": ["dork", "dork"], "2": ["dork"]}, nothing else.
+"""
+
 app = Server("search-mcp")
 
+# Response encoding options shared by the search tools
+OUTPUT_PROPERTIES = {
+    "output_format": {
+        "type": "string",
+        "enum": list(OUTPUT_FORMATS),
+        "description": "pretty: indented JSON with every field. compact: no whitespace and no duplicated links lists",
+        "default": "pretty"
+    },
+    "fields": {
+        "type": "array",
+        "items": {"type": "string", "enum": list(RESULT_FIELDS)},
+        "description": "Only return these fields for each search result; a single field is returned as a plain list"
+    },
+    "snippet_max_chars": {
+        "type": "integer",
+        "minimum": 0,
+        "description": "Truncate result snippets to this many characters"
+    },
+    "dedupe": {
+        "type": "boolean",
+        "description": "Collapse results with near-identical titles and snippets (mirrors, localized copies, reposts) into one with a cluster_size",
+        "default": False
+    },
+    "extract": {
+        "type": "boolean",
+        "description": "Also return person/profile records (name, headline, company, location) parsed from LinkedIn, Twitter and Instagram results",
+        "default": False
+    }
+}
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available tools."""
@@ -362,27 +529,137 @@ async def list_tools() -> list[Tool]:
                     "query": {
                         "type": "string",
                         "description": "Natural language description of what you want to find"
-                    }
+                    },
+                    "max_results": {
+                        "type": "integer",
+                        "description": "Results to fetch per dork, paging through Custom Search 10 at a time",
+                        "minimum": 1,
+                        "maximum": 100,
+                        "default": 5
+                    },
+                    "priority": {
+                        "type": "string",
+                        "enum": ["interactive", "bulk"],
+                        "description": "Scheduling class for Custom Search calls; interactive requests go ahead of bulk ones",
+                        "default": "interactive"
+                    },
+                    "merge": {
+                        "type": "boolean",
+                        "description": "Return one deduplicated list ranked across all dorks instead of per-dork results",
+                        "default": False
+                    },
+                    "progressive": {
+                        "type": "boolean",
+                        "description": "Send each query_N result as a notification as soon as its search completes",
+                        "default": False
+                    },
+                    **OUTPUT_PROPERTIES
                 },
                 "required": ["query"]
             }
+        ),
+        Tool(
+            name="generate_google_dorks_batch",
+            description="""Generates Google search queries for many natural language queries at once and searches them.
+            Queries are packed into shared model calls and the resulting dorks are searched once each, even when several queries produce the same dork.""",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "queries": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Natural language descriptions of what you want to find"
+                    },
+                    "max_results": {
+                        "type": "integer",
+                        "description": "Results to fetch per dork, paging through Custom Search 10 at a time",
+                        "minimum": 1,
+                        "maximum": 100,
+                        "default": 5
+                    },
+                    "priority": {
+                        "type": "string",
+                        "enum": ["interactive", "bulk"],
+                        "description": "Scheduling class for Custom Search calls",
+                        "default": "bulk"
+                    },
+                    **OUTPUT_PROPERTIES
+                },
+                "required": ["queries"]
+            }
+        ),
+        Tool(
+            name="get_search_metrics",
+            description="Get cache, quota and request coalescing counters for this server",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
         )
     ]
 
-def search_with_google_api(query: str) -> dict:
-    """Search using Google's Custom Search API."""
-    logger.info(f"Searching with Google API for: {query[:50]}...")
+def normalize_dork(query: str) -> str:
+    """Collapse whitespace so trivially different spellings of a dork share a cache entry."""
+    return " ".join(query.split())
+
+def search_cache_key(query: str, num: int, start: int = 1) -> str:
+    return f"{normalize_dork(query)}|num={num}|start={start}"
+
+# Long-lived API clients, opened by main() and shared by every tool call
+anthropic_client: anthropic.AsyncAnthropic | None = None
+cse_client: AsyncCustomSearchClient | None = None
+
+def get_anthropic_client() -> anthropic.AsyncAnthropic:
+    """Return the shared Anthropic client, creating it on first use."""
+    global anthropic_client
+    if anthropic_client is None:
+        anthropic_client = anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY, base_url=ANTHROPIC_BASE_URL)
+    return anthropic_client
+
+def get_cse_client() -> AsyncCustomSearchClient:
+    """Return the shared Custom Search client, creating it on first use."""
+    global cse_client
+    if cse_client is None:
+        cse_client = AsyncCustomSearchClient(
+            GOOGLE_API_KEY,
+            endpoint=GOOGLE_CSE_ENDPOINT,
+            max_connections=CSE_MAX_CONNECTIONS
+        )
+    return cse_client
+
+async def close_clients() -> None:
+    """Close the shared API clients and their connection pools."""
+    global anthropic_client, cse_client
+    if anthropic_client is not None:
+        await anthropic_client.close()
+        anthropic_client = None
+    if cse_client is not None:
+        await cse_client.aclose()
+        cse_client = None
+
+def cached_search_page(query: str, num: int = 5, start: int = 1, allow_stale: bool = False) -> dict | None:
+    """Return a cached page of results, or None if it has to be fetched."""
+    cached = search_cache.get(search_cache_key(query, num, start), allow_stale)
+    if cached is None:
+        return None
+    logger.info(f"Search cache hit for: {query[:50]}... "
+                f"(hits={search_cache.hits}, misses={search_cache.misses})")
+    return {**cached, 'quota_used': 0}
+
+async def search_with_google_api(query: str, num: int = 5, start: int = 1) -> dict:
+    """Search one page using Google's Custom Search API and cache the result."""
+    cache_key = search_cache_key(query, num, start)
+    logger.info(f"Searching with Google API for: {query[:50]}... "
+                f"(cache hits={search_cache.hits}, misses={search_cache.misses})")
     
     try:
-        # Build a service object for interacting with the API
-        service = build("customsearch", "v1", developerKey=GOOGLE_API_KEY)
-        
-        # Execute the search
-        result = service.cse().list(
+        # Execute the search on the shared connection pool
+        result = await get_cse_client().list(
             q=query,
             cx=GOOGLE_CSE_ID,
-            num=5  # Number of results to return
-        ).execute()
+            num=num,  # Number of results to return
+            start=start  # 1-based rank of the first result
+        )
         
         # Process results
         items = result.get('items', [])
@@ -403,41 +680,426 @@ def search_with_google_api(query: str) -> dict:
         
         logger.info(f"Found {len(results)} results using Google API")
         
-        return {
+        response = {
             'data': results,
             'links': links
         }
+        await asyncio.get_running_loop().run_in_executor(search_executor, search_cache.set, cache_key, response)
+        return {**response, 'quota_used': 1}
     except Exception as e:
         logger.error(f"Error using Google Search API: {str(e)}")
         return {
             'data': [],
             'links': [],
-            'error': str(e)
+            'error': str(e),
+            'quota_used': 1
         }
 
-@app.call_tool()
-async def call_tool(name: str, arguments: Any) -> Sequence[TextContent]:
-    try:
-        if name != "generate_google_dorks":
-            raise ValueError(f"Unknown tool: {name}")
+async def search_page(query: str, num: int, start: int, priority: int = PRIORITY_INTERACTIVE) -> dict:
+    """Fetch one page from the cache or, when the quota scheduler admits it, from the API.
 
-        if not isinstance(arguments, dict):
-            raise RuntimeError("arguments must be dictionary")
-        
-        if "query" not in arguments:
-            raise RuntimeError("Missing required argument: query")
+    Once the daily budget is exhausted, expired cache entries are served
+    (marked stale) rather than failing outright.
+    """
+    loop = asyncio.get_running_loop()
+    page = await loop.run_in_executor(search_executor, cached_search_page, query, num, start)
+    if page is not None:
+        return page
 
-        # Step 1: Generate search queries using Anthropic API
-        logger.info("Generating search queries with Anthropic API...")
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-        
-        # Generate the prompt with the user's query
-        prompt = DORKS_TEMPLATE.replace("{query}", arguments["query"])
-        
-        # Call Claude
-        message = client.messages.create(
-            model="claude-3-opus-20240229",
-            max_tokens=4096,
+    async def fetch_uncached() -> dict:
+        try:
+            await quota_scheduler.acquire(priority)
+        except QuotaExhausted as e:
+            stale = await loop.run_in_executor(search_executor, cached_search_page, query, num, start, True)
+            if stale is not None:
+                return {**stale, 'stale': True}
+            return {
+                'data': [],
+                'links': [],
+                'error': str(e),
+                'quota_used': 0
+            }
+        if not CSE_HEDGING:
+            return await search_with_google_api(query, num, start)
+        page, backups = await cse_hedger.run(
+            lambda: search_with_google_api(query, num, start),
+            lambda: quota_scheduler.acquire(priority)
+        )
+        return {**page, 'quota_used': page['quota_used'] + backups} if backups else page
+
+    # Concurrent requests for the same page wait for one API call; only the first pays for it
+    page, coalesced = await search_flight.do(search_cache_key(query, num, start), fetch_uncached)
+    if coalesced:
+        logger.info(f"Coalesced search for: {query[:50]}...")
+        return {**page, 'quota_used': 0}
+    return page
+
+def plan_pages(max_results: int) -> list[tuple[int, int]]:
+    """Split max_results into (start, num) Custom Search pages."""
+    max_results = min(max(1, max_results), CSE_MAX_RESULTS)
+    return [
+        (start, min(CSE_PAGE_SIZE, max_results - start + 1))
+        for start in range(1, max_results + 1, CSE_PAGE_SIZE)
+    ]
+
+def plan_searches(queries: list, max_results: int) -> tuple[list, dict | None]:
+    """Prune redundant dorks, returning the dorks to search and what planning saved."""
+    if not DORK_PLANNING:
+        return queries, None
+    planned, stats = plan_dorks(queries)
+    stats["cse_calls_saved"] = (stats["generated"] - stats["planned"]) * len(plan_pages(max_results))
+    return planned, stats
+
+def merge_pages(pages: list[dict | None], plan: list[tuple[int, int]]) -> dict:
+    """Concatenate pages in rank order, stopping after the first short or failed page.
+
+    Pages already in flight when an earlier page came back short are dropped
+    from the data, but the quota they spent is still counted.
+    """
+    data = []
+    links = []
+    quota_used = sum(page['quota_used'] for page in pages if page is not None)
+    error = None
+    stale = False
+    for page, (start, num) in zip(pages, plan):
+        if page is None:
+            break
+        stale = stale or page.get('stale', False)
+        data.extend(page['data'])
+        links.extend(page['links'])
+        if 'error' in page:
+            error = page['error']
+            break
+        if len(page['data']) < num:
+            break
+
+    merged = {
+        'data': data,
+        'links': links,
+        'quota_used': quota_used
+    }
+    if error is not None:
+        merged['error'] = error
+    if stale:
+        merged['stale'] = True
+    return merged
+
+ResultCallback = Callable[[int, str, dict], Awaitable[None]]
+
+class ProgressReporter:
+    """Delivers each query_N result to the client as soon as its search completes.
+
+    A progress notification is sent when the caller supplied a progress token,
+    and the partial result itself is sent as a log message notification.
+    """
+
+    def __init__(self, session, progress_token=None, total: int | None = None):
+        self.session = session
+        self.progress_token = progress_token
+        self.total = total
+        self.completed = 0
+
+    async def __call__(self, i: int, query: str, result: dict) -> None:
+        self.completed += 1
+        key = f"query_{i+1}"
+        try:
+            if self.progress_token is not None:
+                await self.session.send_progress_notification(self.progress_token, self.completed, self.total)
+            await self.session.send_log_message(
+                level="info",
+                data={key: {"query": query, "results": result}},
+                logger="search-mcp"
+            )
+        except Exception as e:
+            logger.warning(f"Could not send progress for {key}: {str(e)}")
+
+class ProgressFanout:
+    """Delivers the progress of one shared search run to every caller waiting on it.
+
+    subscribe() returns the results delivered before the caller joined, so
+    it can replay them; every later result goes to all subscribers.
+    """
+
+    def __init__(self):
+        self.total = None
+        self.reporters: list[ProgressReporter] = []
+        self.delivered: list[tuple[int, str, dict]] = []
+
+    def subscribe(self, reporter: ProgressReporter) -> list[tuple[int, str, dict]]:
+        reporter.total = self.total
+        self.reporters.append(reporter)
+        return list(self.delivered)
+
+    def set_total(self, total: int) -> None:
+        self.total = total
+        for reporter in self.reporters:
+            reporter.total = total
+
+    async def __call__(self, i: int, query: str, result: dict) -> None:
+        self.delivered.append((i, query, result))
+        await asyncio.gather(*(reporter(i, query, result) for reporter in list(self.reporters)))
+
+async def replay_progress(reporter: ProgressReporter, delivered: list[tuple[int, str, dict]]) -> None:
+    for i, query, result in delivered:
+        await reporter(i, query, result)
+
+def progress_reporter() -> ProgressReporter | None:
+    """Build a reporter for the current MCP request, or None outside a request."""
+    try:
+        ctx = app.request_context
+    except LookupError:
+        return None
+    progress_token = ctx.meta.progressToken if ctx.meta else None
+    return ProgressReporter(ctx.session, progress_token)
+
+def without_quota(final_results: dict) -> dict:
+    """Copy of shared query_N results with quota_used zeroed, for callers that did not pay for them."""
+    copied = {
+        key: {**entry, "results": {**entry["results"], "quota_used": 0}}
+        for key, entry in final_results.items() if key.startswith("query_")
+    }
+    copied["meta"] = {**final_results["meta"], "quota_used": 0}
+    return copied
+
+def summarize_results(final_results: dict) -> str:
+    """One-line summary sent at the end of a progressive call."""
+    searches = [entry["results"] for key, entry in final_results.items() if key.startswith("query_")]
+    total = sum(len(result.get("data", [])) for result in searches)
+    errors = sum(1 for result in searches if "error" in result)
+    return f"Completed {len(searches)} searches: {total} results, {errors} errors"
+
+async def search_dork(i: int, query: str, semaphore: asyncio.Semaphore,
+                      on_result: ResultCallback | None = None, max_results: int = 5,
+                      priority: int = PRIORITY_INTERACTIVE) -> dict:
+    """Search one dork, fetching as many pages as max_results needs.
+
+    The first page is fetched on its own; if it comes back full the remaining
+    pages are fetched in parallel. Pages that start after a short page are
+    skipped if they have not been sent yet, and are dropped from the merge.
+    """
+    plan = plan_pages(max_results)
+    stop_after = None
+
+    async def fetch_page(start: int, num: int) -> dict | None:
+        nonlocal stop_after
+        async with semaphore:
+            if stop_after is not None and start > stop_after:
+                return None
+            page = await search_page(query, num, start, priority)
+        if len(page['data']) < num or 'error' in page:
+            stop_after = start if stop_after is None else min(stop_after, start)
+        return page
+
+    logger.info(f"Processing query {i+1}: {query[:50]}...")
+    pages = [await fetch_page(*plan[0])]
+    if stop_after is None and len(plan) > 1:
+        pages.extend(await asyncio.gather(*(fetch_page(start, num) for start, num in plan[1:])))
+
+    result = merge_pages(pages, plan)
+    if on_result is not None:
+        await on_result(i, query, result)
+    return result
+
+def build_final_results(queries: list, results: list) -> dict:
+    """Pair each dork with its search results under query_N keys."""
+    final_results = {}
+    for i, (query, result) in enumerate(zip(queries, results)):
+        final_results[f"query_{i+1}"] = {
+            "query": query,
+            "results": result
+        }
+    final_results["meta"] = {
+        "quota_used": sum(result.get("quota_used", 0) for result in results)
+    }
+    return final_results
+
+async def run_dork_searches(queries: list, on_result: ResultCallback | None = None,
+                            max_results: int = 5, priority: int = PRIORITY_INTERACTIVE) -> dict:
+    """Search all dorks concurrently, keeping the query_N ordering of the results."""
+    semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+    results = await asyncio.gather(*(
+        search_dork(i, query, semaphore, on_result, max_results, priority) for i, query in enumerate(queries)
+    ))
+    return build_final_results(queries, results)
+
+async def stream_dorks_and_search(user_query: str, on_result: ResultCallback | None = None,
+                                  max_results: int = 5, priority: int = PRIORITY_INTERACTIVE,
+                                  on_total: Callable[[int], None] | None = None) -> tuple[list, dict, str]:
+    """Stream dork generation and start each search as soon as its dork is complete.
+
+    on_total is called with the number of dorks once the stream is complete.
+    Returns the generated dorks, the query_N results and the raw response text.
+    """
+    semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+    parser = DorkStreamParser()
+    queries = []
+    tasks = []
+    skipped = 0
+
+    # Searches start before the response is complete, so streaming always uses the first tier
+    tier = model_router.tiers[0]
+    started = time.perf_counter()
+    try:
+        async with get_anthropic_client().messages.stream(
+            model=tier.model,
+            max_tokens=tier.max_tokens,
+            temperature=0,
+            messages=[
+                {
+                    "role": "user",
+                    "content": DORKS_TEMPLATE.replace("{query}", user_query)
+                }
+            ]
+        ) as stream:
+            async for text in stream.text_stream:
+                for query in parser.feed(text):
+                    # Earlier dorks are already being searched, so only drop the ones they cover
+                    if DORK_PLANNING and is_covered(query, queries):
+                        skipped += 1
+                        continue
+                    logger.info(f"Streamed dork {len(queries) + 1}: {query[:50]}...")
+                    tasks.append(asyncio.create_task(search_dork(len(queries), query, semaphore, on_result, max_results, priority)))
+                    queries.append(query)
+    except BaseException as e:
+        for task in tasks:
+            task.cancel()
+        # A failed call that has not started any search can still be escalated by the caller
+        if not isinstance(e, Exception) or not model_router.record(
+                0, "errors", time.perf_counter() - started, can_escalate=not tasks):
+            raise
+        return [], build_final_results([], []), ""
+
+    model_router.record(0, "ok" if queries else "invalid", time.perf_counter() - started)
+    if on_total is not None:
+        on_total(len(queries))
+    results = await asyncio.gather(*tasks)
+    final_results = build_final_results(queries, results)
+    if DORK_PLANNING:
+        final_results["meta"]["dork_plan"] = {
+            "generated": len(queries) + skipped,
+            "planned": len(queries),
+            "cse_calls_saved": skipped * len(plan_pages(max_results))
+        }
+    return queries, final_results, parser.text
+
+async def shared_stream_search(flight_key: str, user_query: str, reporter: ProgressReporter | None,
+                               max_results: int, priority: int) -> tuple[tuple[list, dict, str], bool]:
+    """Run stream_dorks_and_search once per flight key and share its progress with every caller.
+
+    A caller that joins a run already in flight gets the results delivered
+    so far replayed, then follows the run live. One that joins before the
+    run has started streaming, or as it ends, gets every result sent once
+    the shared run completes. Returns the stream's result and whether it
+    was coalesced.
+    """
+    shared = stream_progress.get(flight_key)
+    backlog = shared.subscribe(reporter) if shared is not None and reporter is not None else None
+
+    async def lead() -> tuple[list, dict, str]:
+        fanout = stream_progress[flight_key] = ProgressFanout()
+        if reporter is not None:
+            fanout.subscribe(reporter)
+        try:
+            return await stream_dorks_and_search(user_query, fanout, max_results, priority, fanout.set_total)
+        finally:
+            if stream_progress.get(flight_key) is fanout:
+                del stream_progress[flight_key]
+
+    flight = generation_flight.do(flight_key, lead)
+    if backlog:
+        (result, coalesced), _ = await asyncio.gather(flight, replay_progress(reporter, backlog))
+    else:
+        result, coalesced = await flight
+    if coalesced and reporter is not None and backlog is None:
+        queries, final_results, _ = result
+        reporter.total = len(queries)
+        await replay_progress(reporter, [
+            (i, entry["query"], entry["results"])
+            for i, entry in enumerate(entry for key, entry in final_results.items() if key.startswith("query_"))
+        ])
+    return result, coalesced
+
+def normalize_user_query(query: str) -> str:
+    """Fold case, punctuation and whitespace so equivalent questions share a generation."""
+    folded = re.sub(r"[^\w\s]", " ", query.casefold())
+    return " ".join(folded.split())
+
+def parse_dorks(response_text: str) -> list:
+    """Extract the JSON list of dorks from a model response."""
+    if "```json" in response_text:
+        json_str = response_text.split("```json")[1].split("```")[0].strip()
+    else:
+        json_str = response_text.strip()
+    return json.loads(json_str)
+
+class DorkGenerationError(Exception):
+    """The model response could not be turned into dorks."""
+
+    def __init__(self, message: str, raw_response: str):
+        super().__init__(message)
+        self.raw_response = raw_response
+
+_DORK_OPERATOR = re.compile(r'\b[a-z]+:\S|"')
+
+def dork_list_problem(queries: Any, strict: bool = False) -> str | None:
+    """Say why parsed model output is not a usable list of dorks, or return None if it is.
+
+    Every dork must be a non-empty string. With strict set, too few dorks
+    and dorks that mostly use no search operator are rejected as well.
+    """
+    if not isinstance(queries, list) or not queries or not all(isinstance(q, str) and q.strip() for q in queries):
+        return "response is not a JSON array of dorks"
+    if strict:
+        if len(queries) < DORK_MIN_DORKS:
+            return f"only {len(queries)} dorks returned"
+        if sum(1 for query in queries if _DORK_OPERATOR.search(query)) * 2 < len(queries):
+            return "most dorks use no search operator"
+    return None
+
+def validate_dorks(message, strict: bool) -> list:
+    """Check that a model response is a JSON array of dorks.
+
+    With strict set (a larger model is available) truncated responses, too
+    few dorks and dorks that mostly use no search operator are rejected as
+    low confidence as well.
+    """
+    text = message.content[0].text
+    try:
+        queries = parse_dorks(text)
+    except Exception as e:
+        raise DorkGenerationError(str(e), text)
+    if strict and message.stop_reason == "max_tokens":
+        raise DorkGenerationError("response was cut off at the token budget", text)
+    problem = dork_list_problem(queries, strict)
+    if problem is not None:
+        raise DorkGenerationError(problem, text)
+    return queries
+
+async def cached_dorks(generation_key: str) -> list | None:
+    """Dorks cached for a query, or None on a miss or an unusable entry."""
+    queries = await asyncio.get_running_loop().run_in_executor(search_executor, generation_cache.get, generation_key)
+    if queries is not None and dork_list_problem(queries) is not None:
+        logger.warning(f"Ignoring invalid cached dorks for {generation_key!r}")
+        return None
+    return queries
+
+async def cache_dorks(generation_key: str, queries: list) -> None:
+    """Store dorks in the generation cache off the event loop."""
+    await asyncio.get_running_loop().run_in_executor(search_executor, generation_cache.set, generation_key, queries)
+
+async def generate_dorks(user_query: str, first_tier: int = 0) -> tuple[list, str]:
+    """Generate dorks for one natural-language query and store them in the generation cache.
+
+    Returns the dorks and the name of the model tier that produced them.
+    """
+    logger.info("Generating search queries with Anthropic API...")
+    # Generate the prompt with the user's query
+    prompt = DORKS_TEMPLATE.replace("{query}", user_query)
+
+    async def call(tier: ModelTier):
+        return await get_anthropic_client().messages.create(
+            model=tier.model,
+            max_tokens=tier.max_tokens,
             temperature=0,
             messages=[
                 {
@@ -447,41 +1109,304 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent]:
             ]
         )
 
-        try:
-            # Extract the JSON array of queries
-            response_text = message.content[0].text
-            if "```json" in response_text:
-                json_str = response_text.split("```json")[1].split("```")[0].strip()
-            else:
-                json_str = response_text.strip()
-            
-            queries = json.loads(json_str)
-            logger.info(f"Generated {len(queries)} search queries")
-            
-            # Step 2: Process each query with Google API
-            final_results = {}
-            for i, query in enumerate(queries):
-                logger.info(f"Processing query {i+1}: {query[:50]}...")
-                final_results[f"query_{i+1}"] = {
-                    "query": query,
-                    "results": search_with_google_api(query)
+    queries, tier_name = await model_router.run(call, validate_dorks, first_tier)
+    logger.info(f"Dorks generated by the {tier_name} model tier")
+    await cache_dorks(normalize_user_query(user_query), queries)
+    return queries, tier_name
+
+def output_options(arguments: dict) -> dict:
+    """Pick the format_results keyword arguments out of the tool arguments."""
+    snippet_max_chars = arguments.get("snippet_max_chars")
+    return {
+        "output_format": arguments.get("output_format", "pretty"),
+        "fields": arguments.get("fields"),
+        "snippet_max_chars": int(snippet_max_chars) if snippet_max_chars is not None else None
+    }
+
+def collect_metrics() -> dict:
+    """Counters from the caches, the quota scheduler and request coalescing."""
+    return {
+        "search_cache": search_cache.stats(),
+        "generation_cache": generation_cache.stats(),
+        "quota": quota_scheduler.stats(),
+        "model_routing": model_router.stats(),
+        "hedging": {"enabled": CSE_HEDGING, **cse_hedger.stats()},
+        "coalescing": {
+            "generation": generation_flight.stats(),
+            "search": search_flight.stats()
+        }
+    }
+
+async def generate_dork_batch(user_queries: list[str]) -> tuple[dict[str, list], dict[str, str]]:
+    """Generate dorks for several queries with one model call.
+
+    Returns the dorks keyed by query, and for queries the response had no
+    usable dorks for, the reason keyed by query.
+    """
+    numbered = "\n".join(f"User Query {n}: {query}" for n, query in enumerate(user_queries, start=1))
+
+    async def call(tier: ModelTier):
+        return await get_anthropic_client().messages.create(
+            model=tier.model,
+            # Each packed query gets the tier's budget, up to the per-call ceiling
+            max_tokens=min(tier.max_tokens * len(user_queries), max(tier.max_tokens, BATCH_MAX_TOKENS)),
+            temperature=0,
+            messages=[
+                {
+                    "role": "user",
+                    "content": BATCH_DORKS_TEMPLATE.replace("{queries}", numbered)
                 }
-            
-            # Step 3: Return formatted results
-            formatted_json = json.dumps(final_results, indent=2)
+            ]
+        )
+
+    def validate(message, strict: bool) -> dict:
+        text = message.content[0].text
+        parsed = parse_dorks(text)
+        if not isinstance(parsed, dict):
+            raise DorkGenerationError("response is not a JSON object of dorks", text)
+        if strict and (message.stop_reason == "max_tokens"
+                       or any(dork_list_problem(parsed.get(str(n)), strict) is not None
+                              for n in range(1, len(user_queries) + 1))):
+            raise DorkGenerationError("response is missing queries", text)
+        return parsed
+
+    parsed, _ = await model_router.run(call, validate)
+    generated = {}
+    problems = {}
+    for n, query in enumerate(user_queries, start=1):
+        dorks = parsed.get(str(n))
+        problem = "no dorks returned for this query" if dorks is None else dork_list_problem(dorks)
+        if problem is None:
+            generated[query] = dorks
+        else:
+            problems[query] = problem
+    return generated, problems
+
+def batch_queries_per_call() -> int:
+    """Queries packed into one batch call, few enough that each gets the first tier's full budget."""
+    return max(1, min(BATCH_QUERIES_PER_CALL, BATCH_MAX_TOKENS // model_router.tiers[0].max_tokens))
+
+async def run_batch(user_queries: list[str], max_results: int, priority: int,
+                    extract: bool = False, dedupe: bool = False) -> dict:
+    """Generate and search dorks for many queries, returning results keyed by input query."""
+    # Step 1: Generate dorks, packing cache misses into shared model calls
+    distinct = list(dict.fromkeys(user_queries))
+    rule_dorks = {query: compile_dorks(query) if DORK_RULES else None for query in distinct}
+    lookups = [query for query in distinct if rule_dorks[query] is None]
+    cached = dict(zip(lookups, await asyncio.gather(*(cached_dorks(normalize_user_query(query)) for query in lookups))))
+    generated = {}
+    missing = []
+    compiled = 0
+    for query in distinct:
+        dorks = rule_dorks[query]
+        if dorks is not None:
+            compiled += 1
+        else:
+            dorks = cached[query]
+        if dorks is not None:
+            generated[query] = dorks
+        else:
+            missing.append(query)
+
+    per_call = batch_queries_per_call()
+    chunks = [missing[i:i + per_call] for i in range(0, len(missing), per_call)]
+    logger.info(f"Batch of {len(user_queries)} queries: {compiled} compiled, {len(generated) - compiled} cached, "
+                f"{len(missing)} generated in {len(chunks)} model calls")
+    batches = await asyncio.gather(*(generate_dork_batch(chunk) for chunk in chunks), return_exceptions=True)
+    errors = {}
+    to_cache = []
+    for chunk, batch in zip(chunks, batches):
+        if isinstance(batch, Exception):
+            for query in chunk:
+                errors[query] = f"Error processing queries: {str(batch)}"
+            continue
+        batch_generated, problems = batch
+        for query in chunk:
+            if query in batch_generated:
+                generated[query] = batch_generated[query]
+                to_cache.append(cache_dorks(normalize_user_query(query), batch_generated[query]))
+            else:
+                errors[query] = f"Error processing queries: {problems[query]}"
+    await asyncio.gather(*to_cache)
+
+    # Step 2: Search every distinct dork once through one shared pool
+    total_dorks = sum(len(dorks) for dorks in generated.values())
+    cse_calls_saved = 0
+    for query, dorks in generated.items():
+        generated[query], stats = plan_searches(dorks, max_results)
+        if stats is not None:
+            cse_calls_saved += stats["cse_calls_saved"]
+    unique_dorks = list(dict.fromkeys(
+        normalize_dork(dork) for dorks in generated.values() for dork in dorks
+    ))
+    searched = await run_dork_searches(unique_dorks, max_results=max_results, priority=priority)
+    results_by_dork = {entry["query"]: entry["results"] for key, entry in searched.items() if key.startswith("query_")}
+
+    # Step 3: Fan the shared results back out to each input query
+    results = {}
+    for query in user_queries:
+        if query in errors:
+            results[query] = {"error": errors[query]}
+            continue
+        results[query] = {
+            f"query_{i+1}": {"query": dork, "results": results_by_dork[normalize_dork(dork)]}
+            for i, dork in enumerate(generated[query])
+        }
+        if dedupe:
+            results[query] = dedupe_results(results[query])
+        if extract:
+            results[query]["entities"] = extract_profiles(result_items(results[query]))
+    return {
+        "results": results,
+        "meta": {
+            "rule_compiled": compiled,
+            "llm_calls": len(chunks),
+            "total_dorks": total_dorks,
+            "unique_dorks": len(unique_dorks),
+            "cse_calls_saved": cse_calls_saved,
+            "quota_used": searched["meta"]["quota_used"]
+        }
+    }
+
+@app.call_tool()
+async def call_tool(name: str, arguments: Any) -> Sequence[TextContent]:
+    try:
+        if name == "get_search_metrics":
             return [
                 TextContent(
                     type="text",
-                    text=formatted_json
+                    text=json.dumps(
+                        await asyncio.get_running_loop().run_in_executor(search_executor, collect_metrics), indent=2
+                    )
                 )
             ]
-        except Exception as e:
+
+        if name not in ("generate_google_dorks", "generate_google_dorks_batch"):
+            raise ValueError(f"Unknown tool: {name}")
+
+        if not isinstance(arguments, dict):
+            raise RuntimeError("arguments must be dictionary")
+
+        if name == "generate_google_dorks_batch":
+            if not isinstance(arguments.get("queries"), list):
+                raise RuntimeError("Missing required argument: queries")
+            default_priority = arguments.get("priority", "bulk")
+            if default_priority not in PRIORITIES:
+                raise RuntimeError(f"Unknown priority: {default_priority}")
+            batch_results = await run_batch(
+                arguments["queries"],
+                int(arguments.get("max_results", 5)),
+                PRIORITIES[default_priority],
+                bool(arguments.get("extract")),
+                bool(arguments.get("dedupe"))
+            )
             return [
                 TextContent(
                     type="text",
-                    text=f"Error processing queries: {str(e)}\nRaw response: {message.content[0].text}"
+                    text=format_results(batch_results, **output_options(arguments))
                 )
             ]
+        
+        if "query" not in arguments:
+            raise RuntimeError("Missing required argument: query")
+
+        reporter = progress_reporter() if arguments.get("progressive") else None
+        max_results = int(arguments.get("max_results", 5))
+        if arguments.get("priority", "interactive") not in PRIORITIES:
+            raise RuntimeError(f"Unknown priority: {arguments['priority']}")
+        priority = PRIORITIES[arguments.get("priority", "interactive")]
+
+        # Step 1: Generate search queries: compile known shapes locally, then try the
+        # generation cache, and only ask the model for everything else
+        generation_key = normalize_user_query(arguments["query"])
+        queries = compile_dorks(arguments["query"]) if DORK_RULES else None
+        final_results = None
+        generation_path = "rules"
+        if queries is not None:
+            logger.info("Compiled search queries with local rules")
+        elif (queries := await cached_dorks(generation_key)) is not None:
+            generation_path = "cache"
+            logger.info("Dork generation cache hit")
+        elif DORK_STREAMING:
+            generation_path = "llm"
+            # Overlap generation with search: each dork is searched as soon as it streams in.
+            # Identical concurrent requests share the leader's stream, its progress and its results.
+            logger.info("Streaming search queries from Anthropic API...")
+            (queries, final_results, response_text), coalesced = await shared_stream_search(
+                f"{generation_key}|max_results={max_results}", arguments["query"], reporter, max_results, priority
+            )
+            if coalesced:
+                final_results = without_quota(final_results)
+            model_tier = model_router.tiers[0].name
+            if not queries and len(model_router.tiers) > 1:
+                # The fast tier produced nothing usable; ask the larger model without streaming
+                try:
+                    (queries, model_tier), _ = await generation_flight.do(
+                        generation_key, lambda: generate_dorks(arguments["query"], first_tier=1)
+                    )
+                except DorkGenerationError as e:
+                    response_text = e.raw_response
+                final_results = None
+            if not queries:
+                return [
+                    TextContent(
+                        type="text",
+                        text=f"Error processing queries: no dorks found in response\nRaw response: {response_text}"
+                    )
+                ]
+            await cache_dorks(generation_key, queries)
+        else:
+            generation_path = "llm"
+            try:
+                (queries, model_tier), _ = await generation_flight.do(generation_key, lambda: generate_dorks(arguments["query"]))
+            except DorkGenerationError as e:
+                return [
+                    TextContent(
+                        type="text",
+                        text=f"Error processing queries: {str(e)}\nRaw response: {e.raw_response}"
+                    )
+                ]
+
+        logger.info(f"Generated {len(queries)} search queries")
+        
+        # Step 2: Run every query against the Google API concurrently
+        if final_results is None:
+            queries, dork_plan = plan_searches(queries, max_results)
+            if reporter is not None:
+                reporter.total = len(queries)
+            final_results = await run_dork_searches(queries, reporter, max_results, priority)
+            if dork_plan is not None:
+                final_results["meta"]["dork_plan"] = dork_plan
+        
+        generation_meta = {"generation": generation_path}
+        if generation_path == "llm":
+            generation_meta["model_tier"] = model_tier
+        final_results = {**final_results, "meta": {**final_results["meta"], **generation_meta}}
+        summary = summarize_results(final_results)
+        entities = extract_profiles(result_items(final_results)) if arguments.get("extract") else None
+        if arguments.get("merge"):
+            merged = merge_results(final_results)
+            final_results = {
+                "queries": {key: entry["query"] for key, entry in final_results.items() if key.startswith("query_")},
+                "results": cluster_near_duplicates(merged) if arguments.get("dedupe") else merged,
+                "meta": final_results["meta"]
+            }
+        elif arguments.get("dedupe"):
+            final_results = dedupe_results(final_results)
+        if entities is not None:
+            final_results = {**final_results, "entities": entities}
+
+        # Step 3: Return formatted results
+        formatted_json = format_results(final_results, **output_options(arguments))
+        response = [
+            TextContent(
+                type="text",
+                text=formatted_json
+            )
+        ]
+        if reporter is not None:
+            response.insert(0, TextContent(type="text", text=summary))
+        return response
 
     except Exception as e:
         logging.error(f"Error during call_tool: {str(e)}")
@@ -498,14 +1423,20 @@ async def main():
     if not GOOGLE_CSE_ID:
         raise RuntimeError("GOOGLE_CSE_ID environment variable is required")
 
+    # Open the API clients once, before the first tool call, and share them
+    get_anthropic_client()
+    get_cse_client()
+
     from mcp.server.stdio import stdio_server
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options()
+            )
+    finally:
+        await close_clients()
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
\ No newline at end of file
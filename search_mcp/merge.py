@@ -0,0 +1,90 @@
+"""
+Cross-dork URL canonicalization, deduplication and merged ranking.
+"""
+
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Reciprocal rank fusion constant; larger values flatten the rank curve
+RRF_K = 60
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "igsh", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "refid", "trk", "trkinfo", "trackingid",
+    "lipi", "originalsubdomain", "si"
+}
+
+# Leading www labels mirror the same page on any host
+WWW_LABEL = re.compile(r"^www\d*$")
+
+# Social hosts whose mobile and locale subdomains (m.facebook.com, uk.linkedin.com,
+# mobile.twitter.com) serve the same profiles. Elsewhere a short leading label is
+# a different site: ir.tesla.com, go.microsoft.com, en. and de.wikipedia.org.
+SOCIAL_HOSTS = {"linkedin.com", "twitter.com", "x.com", "instagram.com", "facebook.com"}
+SOCIAL_MIRROR_LABEL = re.compile(r"^(m|mobile|[a-z]{2}(-[a-z]{2})?)$")
+
+
+def canonicalize_url(url: str) -> str:
+    """Reduce a URL to a canonical form shared by its mirrors and tracking variants.
+
+    The result is a deduplication key, not necessarily a working URL.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    labels = host.split(".")
+    # Only strip a label when a registrable domain (two labels) remains
+    while len(labels) > 2 and (
+        WWW_LABEL.match(labels[0])
+        or (".".join(labels[-2:]) in SOCIAL_HOSTS and SOCIAL_MIRROR_LABEL.match(labels[0]))
+    ):
+        labels = labels[1:]
+    host = ".".join(labels)
+
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    params = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith("utm_")
+    )
+    return urlunsplit(("https", host, path, urlencode(params), ""))
+
+
+def merge_results(final_results: dict) -> list[dict]:
+    """Merge query_N results into one list with a single record per canonical URL.
+
+    Each record lists the query_N keys that matched it and a reciprocal rank
+    fusion score, so URLs found by several dorks or ranked highly rise to the
+    top. Link, title and snippet come from the best-ranked occurrence; the
+    key the occurrences were merged on is canonical_link.
+    """
+    merged: dict[str, dict] = {}
+    for key, entry in final_results.items():
+        if not key.startswith("query_"):
+            continue
+        for rank, item in enumerate(entry["results"].get("data", []), start=1):
+            url = canonicalize_url(item.get("link", ""))
+            record = merged.get(url)
+            if record is None:
+                record = merged[url] = {
+                    "link": item.get("link", ""),
+                    "canonical_link": url,
+                    "title": item.get("title", ""),
+                    "snippet": item.get("snippet", ""),
+                    "matched_dorks": [],
+                    "score": 0.0,
+                    "_best_rank": rank
+                }
+            elif rank < record["_best_rank"]:
+                record.update(
+                    link=item.get("link", ""), title=item.get("title", ""), snippet=item.get("snippet", ""),
+                    _best_rank=rank
+                )
+            if key not in record["matched_dorks"]:
+                record["matched_dorks"].append(key)
+            record["score"] += 1 / (RRF_K + rank)
+
+    ranked = sorted(merged.values(), key=lambda record: record["score"], reverse=True)
+    for record in ranked:
+        del record["_best_rank"]
+        record["score"] = round(record["score"], 6)
+    return ranked
@@ -0,0 +1,68 @@
+"""
+Output encoding and field projection for search MCP responses.
+"""
+
+import json
+from typing import Any
+
+OUTPUT_FORMATS = ("pretty", "compact")
+
+RESULT_FIELDS = ("title", "link", "snippet")
+
+
+def _project_item(item: dict, fields: list[str] | None, snippet_max_chars: int | None) -> Any:
+    projected = {
+        key: value for key, value in item.items()
+        if key not in RESULT_FIELDS or fields is None or key in fields
+    }
+    snippet = projected.get("snippet")
+    if snippet_max_chars is not None and isinstance(snippet, str) and len(snippet) > snippet_max_chars:
+        projected["snippet"] = snippet[:snippet_max_chars].rstrip() + "…"
+    # A single projected field on a plain search result is returned as a bare value
+    if fields is not None and len(fields) == 1 and set(projected) <= {fields[0]}:
+        return projected.get(fields[0], "")
+    return projected
+
+
+def _project(node: Any, drop_links: bool, fields: list[str] | None, snippet_max_chars: int | None) -> Any:
+    if isinstance(node, list):
+        return [_project(value, drop_links, fields, snippet_max_chars) for value in node]
+    if not isinstance(node, dict):
+        return node
+
+    if "link" in node and set(node) & {"title", "snippet"}:
+        return _project_item(node, fields, snippet_max_chars)
+
+    projected = {}
+    for key, value in node.items():
+        # The links list repeats data[].link for every dork
+        if key == "links" and drop_links and "data" in node:
+            continue
+        projected[key] = _project(value, drop_links, fields, snippet_max_chars)
+    return projected
+
+
+def format_results(payload: dict, output_format: str = "pretty", fields: list[str] | None = None,
+                   snippet_max_chars: int | None = None) -> str:
+    """Serialize a tool response.
+
+    pretty keeps the indented JSON with every field. compact drops
+    whitespace and the duplicated per-dork links list. fields restricts
+    search results to the given title/link/snippet fields (a single field
+    is returned as a plain list of values) and snippet_max_chars truncates
+    snippets.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise RuntimeError(f"Unknown output_format: {output_format}")
+    if fields is not None:
+        unknown = [field for field in fields if field not in RESULT_FIELDS]
+        if unknown or not fields:
+            raise RuntimeError(f"fields must be a non-empty subset of {list(RESULT_FIELDS)}")
+
+    compact = output_format == "compact"
+    if fields is not None or snippet_max_chars is not None or compact:
+        payload = _project(payload, compact or fields is not None, fields, snippet_max_chars)
+
+    if compact:
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    return json.dumps(payload, indent=2)
@@ -0,0 +1,156 @@
+"""
+Quota-aware scheduling of Google Custom Search requests.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger("search-mcp")
+
+# Priority classes; lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+PRIORITIES = {
+    "interactive": PRIORITY_INTERACTIVE,
+    "bulk": PRIORITY_BULK
+}
+
+# Custom Search daily quotas reset at midnight Pacific Time
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+
+class QuotaExhausted(RuntimeError):
+    """Raised when the daily Custom Search budget has been used up."""
+
+
+class QuotaScheduler:
+    """Admits Custom Search requests under a daily budget and a per-second rate.
+
+    The daily counter is stored in SQLite so it survives restarts and is
+    shared by every server process using the same database; acquire() reads
+    and updates it on a worker thread so the event loop never blocks on the
+    database. Requests wait for a token from a token bucket; when several
+    are waiting the highest priority class goes first, then arrival order.
+    A daily_limit or rate_per_second of 0 means no limit. If the dispatcher
+    fails (for example, the database stays locked), the error is raised to
+    every waiting caller instead of leaving them queued.
+    """
+
+    def __init__(self, path: str, daily_limit: int = 100, rate_per_second: float = 1.5, burst: int = 10):
+        self.daily_limit = daily_limit
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.granted = 0
+        self.rejected = 0
+        self._updated_at = time.monotonic()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._dispatcher: asyncio.Task | None = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS cse_quota (day TEXT PRIMARY KEY, used INTEGER NOT NULL)")
+        self._conn.commit()
+
+    @staticmethod
+    def today() -> str:
+        return datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+    def used_today(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT used FROM cse_quota WHERE day = ?", (self.today(),)).fetchone()
+        return row[0] if row else 0
+
+    def remaining_today(self) -> int | None:
+        """Requests left in today's budget, or None when there is no daily limit."""
+        if self.daily_limit <= 0:
+            return None
+        return max(0, self.daily_limit - self.used_today())
+
+    def _consume_daily(self) -> bool:
+        """Atomically count one request against today's budget if any is left."""
+        day = self.today()
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO cse_quota (day, used) VALUES (?, 0)", (day,))
+            cursor = self._conn.execute(
+                "UPDATE cse_quota SET used = used + 1 WHERE day = ? AND (? <= 0 OR used < ?)",
+                (day, self.daily_limit, self.daily_limit)
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated_at) * self.rate_per_second)
+        self._updated_at = now
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE) -> None:
+        """Wait until a request of the given priority may be sent.
+
+        Raises QuotaExhausted if the daily budget runs out before then.
+        """
+        if await asyncio.to_thread(self.remaining_today) == 0:
+            self.rejected += 1
+            raise QuotaExhausted("Custom Search daily quota exhausted")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self) -> None:
+        future = None
+        try:
+            while self._waiters:
+                _, _, future = self._waiters[0]
+                if future.done():
+                    heapq.heappop(self._waiters)
+                    continue
+
+                if self.rate_per_second > 0:
+                    self._refill()
+                    if self.tokens < 1:
+                        await asyncio.sleep((1 - self.tokens) / self.rate_per_second)
+                        continue
+
+                heapq.heappop(self._waiters)
+                if await asyncio.to_thread(self._consume_daily):
+                    self.tokens -= 1
+                    self.granted += 1
+                    if not future.done():
+                        future.set_result(None)
+                else:
+                    self._reject([future] + [waiter[2] for waiter in self._waiters])
+                    self._waiters.clear()
+        except Exception as e:
+            logger.error(f"Custom Search quota scheduler failed: {str(e)}")
+            for waiting in [future] + [waiter[2] for waiter in self._waiters]:
+                if waiting is not None and not waiting.done():
+                    waiting.set_exception(e)
+            self._waiters.clear()
+
+    def _reject(self, futures: list) -> None:
+        logger.warning("Custom Search daily quota exhausted; rejecting queued requests")
+        for future in futures:
+            if not future.done():
+                self.rejected += 1
+                future.set_exception(QuotaExhausted("Custom Search daily quota exhausted"))
+
+    def stats(self) -> dict:
+        return {
+            "used_today": self.used_today(),
+            "daily_limit": self.daily_limit,
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "queued": len(self._waiters)
+        }
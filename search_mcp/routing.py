@@ -0,0 +1,87 @@
+"""
+Model routing for dork generation: try a fast model first, escalate on bad output.
+"""
+
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any, NamedTuple
+
+from percentiles import percentile
+
+
+class ModelTier(NamedTuple):
+    name: str
+    model: str
+    max_tokens: int
+
+
+class ModelRouter:
+    """Runs a generation against model tiers in order until one passes validation.
+
+    Each call goes to the first tier; if the model call fails or its output
+    does not pass the validator, the next (larger, slower) tier is tried.
+    Only the last tier's failure is raised. Calls, outcomes, escalations and
+    recent latencies are kept per tier.
+    """
+
+    def __init__(self, tiers: list[ModelTier], latency_window: int = 256):
+        if not tiers:
+            raise ValueError("at least one model tier is required")
+        self.tiers = tiers
+        self._stats = [
+            {"calls": 0, "ok": 0, "invalid": 0, "errors": 0, "escalated": 0} for _ in tiers
+        ]
+        self._latencies = [deque(maxlen=latency_window) for _ in tiers]
+
+    def record(self, index: int, outcome: str, latency: float | None = None, can_escalate: bool = True) -> bool:
+        """Count one call to tier index; return True if the caller should escalate to the next tier."""
+        stats = self._stats[index]
+        stats["calls"] += 1
+        stats[outcome] += 1
+        if latency is not None:
+            self._latencies[index].append(latency)
+        escalate = can_escalate and outcome != "ok" and index + 1 < len(self.tiers)
+        if escalate:
+            stats["escalated"] += 1
+        return escalate
+
+    async def run(self, call: Callable[[ModelTier], Awaitable[Any]], validate: Callable[[Any, bool], Any],
+                  first_tier: int = 0) -> tuple[Any, str]:
+        """Return (validated result, tier name) from the first tier whose output validates.
+
+        validate receives the response and whether a further tier is available,
+        so low-confidence checks only apply when there is something to escalate to.
+        """
+        for index in range(first_tier, len(self.tiers)):
+            tier = self.tiers[index]
+            started = time.perf_counter()
+            try:
+                response = await call(tier)
+            except Exception:
+                if not self.record(index, "errors", time.perf_counter() - started):
+                    raise
+                continue
+            latency = time.perf_counter() - started
+            try:
+                result = validate(response, index + 1 < len(self.tiers))
+            except Exception:
+                if not self.record(index, "invalid", latency):
+                    raise
+                continue
+            self.record(index, "ok", latency)
+            return result, tier.name
+        raise ValueError(f"first_tier {first_tier} is out of range")
+
+    def stats(self) -> dict:
+        tiers = {}
+        for tier, stats, latencies in zip(self.tiers, self._stats, self._latencies):
+            ordered = sorted(latencies)
+            tiers[tier.name] = {
+                "model": tier.model,
+                **stats,
+                "escalation_rate": round(stats["escalated"] / stats["calls"], 4) if stats["calls"] else 0.0,
+                "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 1)
+            }
+        return tiers
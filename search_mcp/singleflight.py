@@ -0,0 +1,49 @@
+"""
+Single-flight coalescing of identical concurrent requests.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its result.
+
+    The first caller for a key starts the call; callers arriving while it is
+    still running wait for the same result (or exception) instead of
+    starting their own. The shared call is shielded, so a waiter being
+    cancelled does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """Return (result, coalesced) where coalesced is True if another call's result was reused."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), True
+
+        self.calls += 1
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task), False
+
+    def _forget(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved when every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight)
+        }
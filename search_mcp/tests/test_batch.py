@@ -0,0 +1,44 @@
+"""
+Tests for the token budget of batched dork generation.
+
+Run from search_mcp: python -m pytest tests
+"""
+
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+def test_each_packed_query_gets_the_first_tier_budget(monkeypatch):
+    requested = []
+
+    class Messages:
+        async def create(self, model, max_tokens, temperature, messages):
+            requested.append(max_tokens)
+            count = messages[0]["content"].count("User Query ")
+            dorks = {str(n): [f"site:example.com q{n}", f'intitle:"q{n}"'] for n in range(1, count + 1)}
+            return SimpleNamespace(content=[SimpleNamespace(text=json.dumps(dorks))], stop_reason="end_turn")
+
+    fast = main.model_router.tiers[0].max_tokens
+    monkeypatch.setattr(main, "get_anthropic_client", lambda: SimpleNamespace(messages=Messages()))
+    monkeypatch.setattr(main, "BATCH_QUERIES_PER_CALL", 10)
+    monkeypatch.setattr(main, "BATCH_MAX_TOKENS", fast * 4)
+
+    queries = [f"query number {n}" for n in range(10)]
+    per_call = main.batch_queries_per_call()
+    assert per_call == 4
+
+    async def scenario():
+        chunks = [queries[i:i + per_call] for i in range(0, len(queries), per_call)]
+        return await asyncio.gather(*(main.generate_dork_batch(chunk) for chunk in chunks))
+
+    batches = asyncio.run(scenario())
+    assert sorted(requested) == sorted([fast * 4, fast * 4, fast * 2])
+    assert all(not problems for _, problems in batches)
+    assert sum(len(generated) for generated, _ in batches) == 10
@@ -0,0 +1,154 @@
+"""
+Regression tests for near-duplicate clustering of search results.
+
+Run from search_mcp: python -m pytest tests
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedupe import cluster_ids, cluster_near_duplicates, dedupe_results, strip_boilerplate
+
+
+def linkedin(name: str, handle: str, jobs: int = 3, host: str = "www",
+             headline: str = "Software Engineer - Microsoft") -> dict:
+    return {
+        "title": f"{name} - {headline} | LinkedIn",
+        "link": f"https://{host}.linkedin.com/in/{handle}",
+        "snippet": (
+            f"View {name}'s profile on LinkedIn, the world's largest professional community. "
+            f"{name} has {jobs} jobs listed on their profile. See the complete profile on LinkedIn "
+            f"and discover {name}'s connections and jobs at similar companies."
+        )
+    }
+
+
+def twitter(name: str, handle: str, host: str = "twitter.com", bio: str = "Engineer. Opinions my own.") -> dict:
+    return {
+        "title": f"{name} (@{handle}) / X",
+        "link": f"https://{host}/{handle}",
+        "snippet": f"The latest posts from {name} (@{handle}). {bio}"
+    }
+
+
+def instagram(name: str, handle: str, followers: str = "12.5K") -> dict:
+    return {
+        "title": f"{name} (@{handle}) • Instagram photos and videos",
+        "link": f"https://www.instagram.com/{handle}/",
+        "snippet": (
+            f"{followers} Followers, 310 Following, 842 Posts - See Instagram photos and videos "
+            f"from {name} (@{handle})"
+        )
+    }
+
+
+def test_distinct_linkedin_engineers_are_kept():
+    items = [
+        linkedin("Jennifer Lee", "jennifer-lee-12a4b"),
+        linkedin("Jennifer Park", "jenniferpark"),
+        linkedin("David Kim", "david-kim-sea"),
+        linkedin("Sarah Chen", "sarahchen88")
+    ]
+    clusters = cluster_near_duplicates(items)
+    assert [item["link"] for item in clusters] == [item["link"] for item in items]
+    assert all(item["cluster_size"] == 1 for item in clusters)
+
+
+def test_distinct_twitter_and_instagram_profiles_are_kept():
+    items = [
+        twitter("Jessica Martinez", "jmartinez"),
+        twitter("Jessica Martin", "jmartin"),
+        instagram("Paris Style", "parisstyle"),
+        instagram("Paris Styles", "paris.styles")
+    ]
+    assert cluster_ids(items) == [0, 1, 2, 3]
+
+
+def test_localized_copies_of_one_profile_are_joined():
+    items = [
+        linkedin("Jennifer Lee", "jennifer-lee-12a4b"),
+        linkedin("Jennifer Lee", "jennifer-lee-12a4b", host="de"),
+        linkedin("David Kim", "david-kim-sea"),
+        twitter("Jessica Martinez", "jmartinez"),
+        twitter("Jessica Martinez", "jmartinez", host="x.com")
+    ]
+    assert cluster_ids(items) == [0, 0, 2, 3, 3]
+
+
+def test_mirror_pages_without_profiles_are_joined():
+    article = {
+        "title": "Kubernetes operators in production: lessons from three years",
+        "snippet": "We run more than forty operators across our clusters. Here is what broke, "
+                   "what we rewrote, and what we would do differently next time."
+    }
+    items = [
+        {**article, "link": "https://blog.example.com/k8s-operators"},
+        {**article, "link": "https://medium.com/@author/k8s-operators-3f9a"},
+        {
+            "title": "Kubernetes operators in production",
+            "link": "https://blog.example.com/other",
+            "snippet": "A guide to writing your first operator with kubebuilder."
+        }
+    ]
+    assert cluster_ids(items) == [0, 0, 2]
+
+
+def test_profile_and_non_profile_copy_do_not_bridge_two_people():
+    # A scraped copy of one profile must not chain two different people together
+    lee = linkedin("Jennifer Lee", "jennifer-lee-12a4b")
+    copy = {**lee, "link": "https://people-directory.example/jennifer-lee"}
+    park = {**lee, "link": "https://www.linkedin.com/in/jenniferpark"}
+    roots = cluster_ids([lee, copy, park])
+    assert roots[0] == roots[1]
+    assert roots[2] == 2
+
+
+def test_boilerplate_is_stripped():
+    item = linkedin("Jennifer Lee", "jennifer-lee-12a4b")
+    text = strip_boilerplate(f"{item['title']}\n{item['snippet']}")
+    assert "LinkedIn" not in text
+    assert "Jennifer Lee - Software Engineer - Microsoft" in text
+    assert strip_boilerplate(twitter("Jessica Martinez", "jmartinez")["title"]).strip() == "Jessica Martinez (@jmartinez)"
+
+
+def test_dedupe_results_keeps_every_prospect():
+    results = {
+        "query_1": {
+            "query": 'site:linkedin.com/in "software engineer" "Microsoft"',
+            "results": {"data": [
+                linkedin("Jennifer Lee", "jennifer-lee-12a4b"),
+                linkedin("Jennifer Park", "jenniferpark")
+            ]}
+        },
+        "query_2": {
+            "query": 'site:linkedin.com/in "software engineer" Microsoft Seattle',
+            "results": {"data": [
+                linkedin("Jennifer Lee", "jennifer-lee-12a4b"),
+                linkedin("David Kim", "david-kim-sea")
+            ]}
+        }
+    }
+    deduped = dedupe_results(results)
+    assert [item["link"] for item in deduped["query_1"]["results"]["data"]] == [
+        "https://www.linkedin.com/in/jennifer-lee-12a4b", "https://www.linkedin.com/in/jenniferpark"
+    ]
+    assert [item["link"] for item in deduped["query_2"]["results"]["data"]] == [
+        "https://www.linkedin.com/in/david-kim-sea"
+    ]
+    assert deduped["query_1"]["results"]["data"][0]["cluster_size"] == 2
+
+
+def test_thousands_of_similar_profiles_stay_fast():
+    first = ["Jennifer", "David", "Sarah", "Michael", "Priya", "Wei", "Carlos", "Aisha", "Tom", "Elena"]
+    last = ["Lee", "Park", "Kim", "Chen", "Smith", "Garcia", "Patel", "Nguyen", "Brown", "Rossi"]
+    items = [
+        linkedin(f"{first[i % 10]} {last[i // 10 % 10]}", f"profile-{i:04x}", jobs=i % 7 + 1)
+        for i in range(3000)
+    ]
+    started = time.perf_counter()
+    clusters = cluster_near_duplicates(items)
+    assert len(clusters) == 3000
+    assert time.perf_counter() - started < 5
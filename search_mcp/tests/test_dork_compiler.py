@@ -0,0 +1,76 @@
+"""
+Tests for the rule-based dork compiler.
+
+Run from search_mcp: python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dork_compiler import compile_dorks
+from dork_plan import plan_dorks
+
+
+@pytest.mark.parametrize("query, dorks", [
+    ("Find Jennifer Lee who works at Microsoft", [
+        'site:linkedin.com/in "Jennifer Lee" "Microsoft"',
+        '(site:twitter.com OR site:instagram.com) intitle:"Jennifer Lee" "Microsoft"'
+    ]),
+    ("Find Jennifer Lee who graduated from MIT", [
+        'site:linkedin.com/in "Jennifer Lee" "MIT"',
+        '(site:twitter.com OR site:instagram.com) intitle:"Jennifer Lee" "MIT"'
+    ]),
+    ("Find Mary Ann Smith in Seattle", [
+        'site:linkedin.com/in "Mary Ann Smith" "Seattle"',
+        '(site:twitter.com OR site:instagram.com) intitle:"Mary Ann Smith" "Seattle"'
+    ]),
+    ("Find software engineers at Google in Seattle", [
+        'site:linkedin.com/in "software engineer" "Google" "Seattle"',
+        'site:twitter.com "software engineer" "Google" "Seattle"'
+    ]),
+    ("find data scientists who graduated from Stanford?", [
+        'site:linkedin.com/in "data scientist" "Stanford"',
+        'site:twitter.com "data scientist" "Stanford"'
+    ]),
+    ("Find sales managers in Austin", [
+        'site:linkedin.com/in "sales manager" "Austin"',
+        'site:twitter.com "sales manager" "Austin"'
+    ]),
+    ("Show me attorneys based in Boston", [
+        'site:linkedin.com/in "attorney" "Boston"',
+        'site:twitter.com "attorney" "Boston"'
+    ]),
+])
+def test_compiles_names_and_roles(query, dorks):
+    assert compile_dorks(query) == dorks
+
+
+@pytest.mark.parametrize("query", [
+    "Find hotels in Paris",
+    "Find job postings at Google",
+    "Find Job Postings at Google",
+    "Find sales in Austin",
+    "Find posts about hacking in London",
+    "Find posts about engineers in London",
+    "Find fashion influencers in Paris",
+    "Find Software Engineers at Google",
+    "Find Senior Engineers in Austin",
+    "Find The Best Restaurants in Rome",
+    "Find startups in Berlin",
+    "Find Jennifer Lee's tweets about AI",
+    "What is the weather in Paris",
+])
+def test_other_queries_are_left_to_the_model(query):
+    assert compile_dorks(query) is None
+
+
+def test_person_dorks_survive_planning():
+    # Both dorks must reach Custom Search: neither subsumed by nor merged into the other
+    dorks = compile_dorks("Find Jennifer Lee who works at Microsoft")
+    planned, stats = plan_dorks(dorks)
+    assert planned == dorks
+    assert stats["subsumed"] == 0 and stats["merged"] == 0
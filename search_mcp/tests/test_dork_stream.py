@@ -0,0 +1,56 @@
+"""
+Tests for incremental dork extraction from a streamed model response.
+
+Run from search_mcp: python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dork_stream import DorkStreamParser
+from main import parse_dorks
+
+
+def stream(text: str, size: int) -> list[str]:
+    parser = DorkStreamParser()
+    found = []
+    for i in range(0, len(text), size):
+        found += parser.feed(text[i:i + size])
+    return found
+
+
+RESPONSES = [
+    '["site:linkedin.com/in \\"Jane Doe\\"", "intitle:\\"Jane Doe\\" Seattle"]',
+    '```json\n["site:a.com x", "site:b.com [y]"]\n```',
+    'Here are the dorks [JSON]:\n```json\n["a", "b"]\n```\nThey cover {both} sites.',
+    '  \n["a", {"nested": "b"}, ["c"], "d"]',
+]
+
+
+@pytest.mark.parametrize("text", RESPONSES)
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_matches_non_streaming_parse(text, size):
+    expected = [item for item in parse_dorks(text) if isinstance(item, str)]
+    assert stream(text, size) == expected
+
+
+@pytest.mark.parametrize("text", [
+    '{"dorks": ["a", "b"], "notes": "c"}',
+    '```json\n{"dorks": ["a"]}\n```',
+    'No dorks today, sorry.',
+])
+@pytest.mark.parametrize("size", [1, 1000])
+def test_only_array_elements_are_dorks(text, size):
+    assert stream(text, size) == []
+
+
+def test_dorks_are_reported_as_they_complete():
+    parser = DorkStreamParser()
+    assert parser.feed('```js') == []
+    assert parser.feed('on\n["site:a.com x", "site:') == ["site:a.com x"]
+    assert parser.feed('b.com y"]') == ["site:b.com y"]
+    assert parser.done
@@ -0,0 +1,59 @@
+"""
+Tests for the hedged request budget under concurrency.
+
+Run from search_mcp: python -m pytest tests
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hedging import Hedger
+
+
+def warmed_hedger() -> Hedger:
+    hedger = Hedger(percentile=95, max_ratio=0.1, min_samples=20)
+    for _ in range(20):
+        hedger._latencies.append(0.001)
+    hedger.primaries = 20
+    return hedger
+
+
+async def slow() -> dict:
+    await asyncio.sleep(0.05)
+    return {"data": []}
+
+
+def test_concurrent_slow_requests_respect_the_hedge_cap():
+    hedger = warmed_hedger()
+
+    async def acquire() -> None:
+        await asyncio.sleep(0.01)
+
+    async def scenario():
+        return await asyncio.gather(*(hedger.run(slow, acquire) for _ in range(10)))
+
+    results = asyncio.run(scenario())
+    # 30 primaries allow at most 0.1 * 30 = 3 backups, not one per slow request
+    assert hedger.hedges == 3
+    assert sum(backups for _, backups in results) == 3
+    assert hedger._reserved == 0
+
+
+def test_vetoed_backup_releases_its_reservation():
+    hedger = warmed_hedger()
+
+    async def veto() -> None:
+        await asyncio.sleep(0.005)
+        raise RuntimeError("quota exhausted")
+
+    async def scenario():
+        return await asyncio.gather(*(hedger.run(slow, veto) for _ in range(10)))
+
+    results = asyncio.run(scenario())
+    assert hedger.hedges == 0
+    assert hedger._reserved == 0
+    assert all(backups == 0 for _, backups in results)
+    assert hedger._within_budget()
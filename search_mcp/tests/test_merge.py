@@ -0,0 +1,53 @@
+"""
+Tests for URL canonicalization and merged ranking.
+
+Run from search_mcp: python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from merge import canonicalize_url, merge_results
+
+
+@pytest.mark.parametrize("url, canonical", [
+    ("https://www.linkedin.com/in/john-smith/", "https://linkedin.com/in/john-smith"),
+    ("https://uk.linkedin.com/in/john-smith?trk=public_profile", "https://linkedin.com/in/john-smith"),
+    ("https://mobile.twitter.com/jsmith", "https://twitter.com/jsmith"),
+    ("http://m.facebook.com/jsmith?utm_source=x", "https://facebook.com/jsmith"),
+    ("https://www2.example.com//a//b/", "https://example.com/a/b"),
+])
+def test_mirrors_share_a_canonical_url(url, canonical):
+    assert canonicalize_url(url) == canonical
+
+
+@pytest.mark.parametrize("url", [
+    "https://ir.tesla.com/press",
+    "https://go.microsoft.com/fwlink",
+    "https://en.wikipedia.org/wiki/Paris",
+    "https://de.wikipedia.org/wiki/Paris",
+])
+def test_other_subdomains_are_kept(url):
+    assert canonicalize_url(url) == url
+
+
+def test_merged_link_is_the_best_ranked_original_url():
+    results = {
+        "query_1": {"results": {"data": [
+            {"title": "Other", "link": "https://example.com/other", "snippet": ""},
+            {"title": "John Smith (UK)", "link": "https://uk.linkedin.com/in/john-smith", "snippet": ""}
+        ]}},
+        "query_2": {"results": {"data": [
+            {"title": "John Smith", "link": "https://www.linkedin.com/in/john-smith/", "snippet": ""}
+        ]}}
+    }
+    merged = merge_results(results)
+    assert merged[0]["link"] == "https://www.linkedin.com/in/john-smith/"
+    assert merged[0]["canonical_link"] == "https://linkedin.com/in/john-smith"
+    assert merged[0]["title"] == "John Smith"
+    assert merged[0]["matched_dorks"] == ["query_1", "query_2"]
+    assert merged[1]["link"] == "https://example.com/other"
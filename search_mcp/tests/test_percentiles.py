@@ -0,0 +1,33 @@
+"""
+Tests for the shared nearest-rank percentile.
+
+Run from search_mcp: python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hedging import Hedger
+from percentiles import percentile
+
+SAMPLES = [float(i) for i in range(1, 21)]
+
+
+@pytest.mark.parametrize("pct, expected", [(0, 1.0), (50, 10.0), (95, 19.0), (100, 20.0)])
+def test_nearest_rank(pct, expected):
+    assert percentile(SAMPLES, pct) == expected
+
+
+def test_no_samples():
+    assert percentile([], 95) == 0.0
+
+
+def test_hedge_delay_is_the_configured_percentile():
+    hedger = Hedger(percentile=95, min_samples=20)
+    for latency in reversed(SAMPLES):
+        hedger._latencies.append(latency)
+    assert hedger.delay() == percentile(SAMPLES, 95)
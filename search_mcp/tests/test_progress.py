@@ -0,0 +1,80 @@
+"""
+Tests for progressive results shared between coalesced streaming calls.
+
+Run from search_mcp: python -m pytest tests
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from main import ProgressReporter, build_final_results, shared_stream_search
+
+
+class Session:
+    def __init__(self):
+        self.progress = []
+        self.logged = []
+
+    async def send_progress_notification(self, token, progress, total):
+        self.progress.append((progress, total))
+
+    async def send_log_message(self, level, data, logger):
+        self.logged.extend(data)
+
+
+def fake_stream(release: asyncio.Event):
+    async def stream(user_query, on_result=None, max_results=5, priority=0, on_total=None):
+        queries = ["site:a.com x", "site:b.com x", "site:c.com x"]
+        results = []
+        for i, query in enumerate(queries):
+            if i == 1:
+                await release.wait()
+            if i == len(queries) - 1:
+                on_total(len(queries))
+            result = {"data": [], "links": [], "quota_used": 1}
+            await on_result(i, query, result)
+            results.append(result)
+        return queries, build_final_results(queries, results), ""
+    return stream
+
+
+def run_pair(monkeypatch, follower_delay: bool):
+    async def scenario():
+        release = asyncio.Event()
+        monkeypatch.setattr(main, "stream_dorks_and_search", fake_stream(release))
+        leader, follower = Session(), Session()
+        leading = asyncio.create_task(
+            shared_stream_search("k", "q", ProgressReporter(leader, "t1"), 5, 0)
+        )
+        if follower_delay:
+            # Join after the leader's first result was delivered
+            while not main.stream_progress.get("k") or not main.stream_progress["k"].delivered:
+                await asyncio.sleep(0)
+        following = asyncio.create_task(
+            shared_stream_search("k", "q", ProgressReporter(follower, "t2"), 5, 0)
+        )
+        await asyncio.sleep(0)
+        release.set()
+        (_, led), (_, coalesced) = await asyncio.gather(leading, following)
+        assert (led, coalesced) == (False, True)
+        assert "k" not in main.stream_progress
+        return leader, follower
+    return asyncio.run(scenario())
+
+
+def test_follower_joining_mid_run_gets_every_result(monkeypatch):
+    leader, follower = run_pair(monkeypatch, follower_delay=True)
+    assert leader.logged == ["query_1", "query_2", "query_3"]
+    assert sorted(follower.logged) == ["query_1", "query_2", "query_3"]
+    assert leader.progress[-1] == (3, 3)
+    assert follower.progress[-1] == (3, 3)
+
+
+def test_follower_joining_before_the_stream_starts_gets_every_result(monkeypatch):
+    leader, follower = run_pair(monkeypatch, follower_delay=False)
+    assert follower.logged == ["query_1", "query_2", "query_3"]
+    assert follower.progress == [(1, 3), (2, 3), (3, 3)]
@@ -0,0 +1,103 @@
+"""
+Tests for the Custom Search quota scheduler.
+
+Run from search_mcp: python -m pytest tests
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from cache import SQLiteTTLCache
+from quota import PRIORITY_BULK, PRIORITY_INTERACTIVE, QuotaExhausted, QuotaScheduler
+
+
+def scheduler(tmp_path, **kwargs) -> QuotaScheduler:
+    return QuotaScheduler(str(tmp_path / "quota.db"), **kwargs)
+
+
+def test_interactive_requests_go_before_queued_bulk_ones(tmp_path):
+    quota = scheduler(tmp_path, daily_limit=0, rate_per_second=20, burst=1)
+    order = []
+
+    async def request(name: str, priority: int) -> None:
+        await quota.acquire(priority)
+        order.append(name)
+
+    async def scenario():
+        await quota.acquire()
+        await asyncio.gather(
+            request("bulk_1", PRIORITY_BULK), request("bulk_2", PRIORITY_BULK),
+            request("interactive", PRIORITY_INTERACTIVE)
+        )
+
+    asyncio.run(scenario())
+    assert order == ["interactive", "bulk_1", "bulk_2"]
+
+
+def test_daily_budget_is_shared_and_exhausted(tmp_path):
+    async def scenario():
+        quota = scheduler(tmp_path, daily_limit=3, rate_per_second=0)
+        first = await asyncio.gather(*(quota.acquire() for _ in range(5)), return_exceptions=True)
+        # A second process on the same database sees the spent budget
+        with pytest.raises(QuotaExhausted):
+            await scheduler(tmp_path, daily_limit=3, rate_per_second=0).acquire()
+        return quota, first
+
+    quota, results = asyncio.run(scenario())
+    assert sum(result is None for result in results) == 3
+    assert sum(isinstance(result, QuotaExhausted) for result in results) == 2
+    assert quota.stats()["used_today"] == 3
+
+
+def test_zero_rate_means_unlimited(tmp_path):
+    quota = scheduler(tmp_path, daily_limit=0, rate_per_second=0, burst=1)
+
+    async def scenario():
+        await asyncio.wait_for(asyncio.gather(*(quota.acquire() for _ in range(5))), timeout=2)
+
+    asyncio.run(scenario())
+    assert quota.granted == 5
+
+
+def test_database_errors_reach_every_waiting_caller(tmp_path, monkeypatch):
+    quota = scheduler(tmp_path, daily_limit=0, rate_per_second=0)
+
+    def locked() -> bool:
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(quota, "_consume_daily", locked)
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(*(quota.acquire() for _ in range(3)), return_exceptions=True), timeout=2
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, sqlite3.OperationalError) for result in results)
+    assert quota.stats()["queued"] == 0
+
+
+def test_stale_cache_is_served_once_the_budget_is_spent(tmp_path, monkeypatch):
+    cache = SQLiteTTLCache(str(tmp_path / "cache.db"), table="search_results", ttl=0.01)
+    cache.set(main.search_cache_key("site:example.com x", 10, 1), {"data": [{"link": "a"}], "links": ["a"]})
+    time.sleep(0.02)
+    monkeypatch.setattr(main, "search_cache", cache)
+    monkeypatch.setattr(main, "quota_scheduler", scheduler(tmp_path, daily_limit=1, rate_per_second=0))
+
+    async def scenario():
+        await main.quota_scheduler.acquire()
+        stale = await main.search_page("site:example.com x", 10, 1)
+        missing = await main.search_page("site:example.com y", 10, 1)
+        return stale, missing
+
+    stale, missing = asyncio.run(scenario())
+    assert stale == {"data": [{"link": "a"}], "links": ["a"], "quota_used": 0, "stale": True}
+    assert missing["data"] == [] and missing["quota_used"] == 0 and "quota" in missing["error"]
@@ -0,0 +1,35 @@
+"""
+Tests for per-call quota accounting of multi-page searches.
+
+Run from search_mcp: python -m pytest tests
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+
+def test_quota_counts_pages_dropped_after_a_short_page(monkeypatch):
+    calls = []
+
+    async def search_page(query, num, start, priority=0):
+        calls.append(start)
+        # Page 2 comes back short after the later pages were already sent
+        await asyncio.sleep(0.02 if start == 11 else 0.01)
+        count = 3 if start == 11 else num
+        return {
+            "data": [{"title": "", "link": f"https://example.com/{start + i}", "snippet": ""} for i in range(count)],
+            "links": [f"https://example.com/{start + i}" for i in range(count)],
+            "quota_used": 1
+        }
+
+    monkeypatch.setattr(main, "search_page", search_page)
+    results = asyncio.run(main.run_dork_searches(["q"], max_results=100))
+    assert len(calls) > 2
+    assert len(results["query_1"]["results"]["data"]) == 13
+    assert results["query_1"]["results"]["quota_used"] == len(calls)
+    assert results["meta"]["quota_used"] == len(calls)
@@ -0,0 +1,59 @@
+"""
+Storage interface behind the tracker MCP tools.
+"""
+
+from datetime import datetime
+
+
+class TrackerBackend:
+    """Where tracked URLs and their emails are stored.
+
+    Every backend keeps the same document per URL (url, domain, emails,
+    is_new, created_at, updated_at, keyed by encode_url) and the same
+    semantics: is_new is raised exactly when an email is added to a URL,
+    and emails are never lost to concurrent writers.
+    """
+
+    name = ""
+
+    def start(self) -> None:
+        """Prepare the backend before the server starts serving tools."""
+
+    def close(self) -> None:
+        """Release connections and listeners."""
+
+    def track(self, url: str, email: str) -> bool:
+        """Track one URL/email pair; return True if the email was not tracked for the URL yet."""
+        raise NotImplementedError()
+
+    def track_batch(self, pairs: list[tuple[str, str]], max_parallel: int = 4) -> list[dict]:
+        """Track many pairs; return one {url, email, status} per pair, in order.
+
+        status is new_url, new_email, existing, or error (with an error message).
+        """
+        raise NotImplementedError()
+
+    def lookup(self, url: str | None = None, email: str | None = None) -> dict:
+        """Whether a URL, an email, or an email for a URL is tracked.
+
+        With a url the result has url_tracked, plus email_tracked (for that
+        URL) when an email is given. With only an email it has email_tracked
+        and the tracked URLs the email is associated with. source names
+        where the answer came from.
+        """
+        raise NotImplementedError()
+
+    def query(self, page_size: int = 100, cursor: str | None = None, fields: list[str] | None = None,
+              is_new: bool | None = None, domain: str | None = None,
+              updated_after: datetime | None = None,
+              updated_before: datetime | None = None) -> tuple[list[dict], str | None]:
+        """Return one page of tracked documents and the cursor of the next page (None on the last page).
+
+        Without a date range pages are ordered by document ID; with one they
+        are ordered by updated_at and then document ID.
+        """
+        raise NotImplementedError()
+
+    def stats(self) -> dict:
+        """Counters for get_tracker_metrics."""
+        return {}
@@ -0,0 +1,92 @@
+"""
+Per-operation latency of a tracker storage backend.
+
+Times track, track_batch, lookup and a paginated query against the SQLite
+backend (a fresh database file) or the Firestore backend (the local
+emulator), then checks that concurrent writers for one URL keep every
+email.
+
+    python benchmarks/backend_latency.py --backend sqlite --calls 2000
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python benchmarks/backend_latency.py --backend firestore --calls 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from track_latency import summarize
+
+
+def timed(fn, args: list[tuple]) -> dict:
+    samples = []
+    for arg in args:
+        started = time.perf_counter()
+        fn(*arg)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def create_backend(name: str, path: str, project: str):
+    if name == "sqlite":
+        from sqlite_backend import SqliteBackend
+        return SqliteBackend(path)
+    from google.cloud import firestore
+    from firestore_backend import FirestoreBackend
+    if not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST to the address of a running Firestore emulator")
+    return FirestoreBackend(firestore.Client(project=project), use_index=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["sqlite", "firestore"], default="sqlite")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--writers", type=int, default=16, help="Concurrent writers for the lost-update check")
+    parser.add_argument("--project", default="tracker-bench")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = create_backend(args.backend, os.path.join(tmp, "tracker.db"), args.project)
+        backend.start()
+        run_id = uuid.uuid4().hex[:8]
+        urls = [f"https://bench.example/{run_id}/{i}" for i in range(args.calls)]
+        report = {
+            "backend": args.backend,
+            "calls": args.calls,
+            "track": {
+                "new_url": timed(backend.track, [(url, "first@example.com") for url in urls]),
+                "new_email": timed(backend.track, [(url, "second@example.com") for url in urls]),
+                "repeat": timed(backend.track, [(url, "second@example.com") for url in urls])
+            },
+            "lookup": timed(backend.lookup, [(url, "second@example.com") for url in urls])
+        }
+
+        batch = [(f"https://bench.example/{run_id}/batch/{i}", "batch@example.com") for i in range(args.batch_size)]
+        started = time.perf_counter()
+        backend.track_batch(batch)
+        report["track_batch"] = {"pairs": len(batch), "ms": round((time.perf_counter() - started) * 1000, 3)}
+
+        cursor, page_samples = None, []
+        while True:
+            started = time.perf_counter()
+            _, cursor = backend.query(page_size=100, cursor=cursor, fields=["url", "emails"])
+            page_samples.append(time.perf_counter() - started)
+            if cursor is None:
+                break
+        report["query_page_100"] = {"pages": len(page_samples), **summarize(page_samples)}
+
+        contended = f"https://bench.example/{run_id}/contended"
+        emails = [f"writer{i}@example.com" for i in range(args.writers)]
+        with ThreadPoolExecutor(max_workers=args.writers) as pool:
+            list(pool.map(lambda email: backend.track(contended, email), emails))
+        report["lost_emails"] = sum(not backend.lookup(contended, email)["email_tracked"] for email in emails)
+        backend.close()
+    print(json.dumps(report, indent=2))
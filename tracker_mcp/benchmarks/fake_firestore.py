@@ -0,0 +1,198 @@
+"""
+Local stand-in for the Firestore gRPC API used by the tracker benchmarks.
+
+Implements the calls the track_url_email paths make (BatchGetDocuments,
+BeginTransaction, Commit, Rollback) over an in-memory store, with a fixed
+delay per RPC to model the network round trip, and counts every RPC.
+Transactions lock the documents they read until they commit or roll back,
+like the emulator, and other writes to those documents wait for the lock.
+Queries and listeners are not implemented; use the real emulator for those.
+
+    python benchmarks/fake_firestore.py --port 8086 --rpc-latency 0.02
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8086 python benchmarks/track_latency.py
+"""
+
+import argparse
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent import futures
+from datetime import datetime, timedelta, timezone
+
+import grpc
+from google.cloud.firestore_v1.types import document, firestore, write
+from google.protobuf import empty_pb2
+
+# Tunables, overridable from the command line or by the benchmark driver
+CONFIG = {
+    "rpc_latency": 0.0
+}
+
+SERVICE = "google.firestore.v1.Firestore"
+
+
+class FakeFirestore:
+    """In-memory documents keyed by their full resource name."""
+
+    def __init__(self):
+        self.documents: dict[str, document.Document] = {}
+        self.rpcs = Counter()
+        self._lock = threading.Lock()
+        self._doc_locks: dict[str, threading.Lock] = {}
+        self._held: dict[bytes, set[str]] = {}
+        self._last_time = datetime.now(timezone.utc)
+
+    def _now(self) -> datetime:
+        # Strictly increasing, so update_time preconditions see every write
+        self._last_time = max(datetime.now(timezone.utc), self._last_time + timedelta(microseconds=1))
+        return self._last_time
+
+    def _rpc(self, name: str) -> None:
+        self.rpcs[name] += 1
+        time.sleep(CONFIG["rpc_latency"])
+
+    def _lock_document(self, transaction: bytes, name: str) -> None:
+        with self._lock:
+            held = self._held.setdefault(transaction, set())
+            if name in held:
+                return
+            doc_lock = self._doc_locks.setdefault(name, threading.Lock())
+        doc_lock.acquire()
+        held.add(name)
+
+    def _release(self, transaction: bytes) -> None:
+        with self._lock:
+            names = self._held.pop(transaction, set())
+        for name in names:
+            self._doc_locks[name].release()
+
+    def begin_transaction(self, request, context):
+        self._rpc("BeginTransaction")
+        return firestore.BeginTransactionResponse(transaction=uuid.uuid4().bytes)
+
+    def rollback(self, request, context):
+        self._rpc("Rollback")
+        self._release(request.transaction)
+        return empty_pb2.Empty()
+
+    def batch_get_documents(self, request, context):
+        self._rpc("BatchGetDocuments")
+        with self._lock:
+            read_time = self._now()
+        for name in request.documents:
+            if request.transaction:
+                self._lock_document(request.transaction, name)
+            stored = self.documents.get(name)
+            if stored is None:
+                yield firestore.BatchGetDocumentsResponse(missing=name, read_time=read_time)
+                continue
+            found = document.Document(stored)
+            if request.mask.field_paths:
+                for field in list(found.fields.keys()):
+                    if field not in request.mask.field_paths:
+                        del found.fields[field]
+            yield firestore.BatchGetDocumentsResponse(found=found, read_time=read_time)
+
+    def commit(self, request, context):
+        self._rpc("Commit")
+        # Writes wait for the documents' locks too, so they queue behind open transactions
+        owner = request.transaction or uuid.uuid4().bytes
+        for name in sorted({item.update.name or item.delete for item in request.writes}):
+            self._lock_document(owner, name)
+        try:
+            with self._lock:
+                commit_time = self._now()
+                # Check every precondition before applying any write
+                for item in request.writes:
+                    stored = self.documents.get(item.update.name or item.delete)
+                    if "current_document" in item:
+                        condition = item.current_document
+                        if "exists" in condition and condition.exists != (stored is not None):
+                            context.abort(
+                                grpc.StatusCode.ALREADY_EXISTS if stored is not None else grpc.StatusCode.NOT_FOUND,
+                                "precondition failed: exists"
+                            )
+                        if "update_time" in condition and (
+                                stored is None or stored.update_time != condition.update_time):
+                            context.abort(grpc.StatusCode.FAILED_PRECONDITION, "precondition failed: update_time")
+                results = [self._apply(item, commit_time) for item in request.writes]
+        finally:
+            self._release(owner)
+        return firestore.CommitResponse(write_results=results, commit_time=commit_time)
+
+    def _apply(self, item: write.Write, commit_time: datetime) -> write.WriteResult:
+        if item.delete:
+            self.documents.pop(item.delete, None)
+            return write.WriteResult(update_time=commit_time)
+        name = item.update.name
+        stored = self.documents.get(name)
+        fields = dict(stored.fields) if stored is not None else {}
+        if "update_mask" in item:
+            for path in item.update_mask.field_paths:
+                if path in item.update.fields:
+                    fields[path] = item.update.fields[path]
+                else:
+                    fields.pop(path, None)
+        else:
+            fields = dict(item.update.fields)
+        for transform in item.update_transforms:
+            path = transform.field_path
+            if "set_to_server_value" in transform:
+                fields[path] = document.Value(timestamp_value=commit_time)
+            elif "append_missing_elements" in transform:
+                current = fields.get(path)
+                values = list(current.array_value.values) if current is not None and "array_value" in current else []
+                for value in transform.append_missing_elements.values:
+                    if value not in values:
+                        values.append(value)
+                fields[path] = document.Value(array_value=document.ArrayValue(values=values))
+        self.documents[name] = document.Document(
+            name=name,
+            fields=fields,
+            create_time=stored.create_time if stored is not None else commit_time,
+            update_time=commit_time
+        )
+        return write.WriteResult(update_time=commit_time)
+
+
+def _handlers(store: FakeFirestore) -> grpc.GenericRpcHandler:
+    def unary(fn, request_type, response_serializer):
+        return grpc.unary_unary_rpc_method_handler(
+            fn, request_deserializer=request_type.deserialize, response_serializer=response_serializer
+        )
+
+    return grpc.method_handlers_generic_handler(SERVICE, {
+        "BeginTransaction": unary(
+            store.begin_transaction, firestore.BeginTransactionRequest, firestore.BeginTransactionResponse.serialize
+        ),
+        "Commit": unary(store.commit, firestore.CommitRequest, firestore.CommitResponse.serialize),
+        "Rollback": unary(store.rollback, firestore.RollbackRequest, empty_pb2.Empty.SerializeToString),
+        "BatchGetDocuments": grpc.unary_stream_rpc_method_handler(
+            store.batch_get_documents,
+            request_deserializer=firestore.BatchGetDocumentsRequest.deserialize,
+            response_serializer=firestore.BatchGetDocumentsResponse.serialize
+        )
+    })
+
+
+def start_fake_firestore(host: str = "127.0.0.1", port: int = 0, workers: int = 64) -> tuple[grpc.Server, str, FakeFirestore]:
+    """Start the fake API on background threads and return (server, emulator host, store)."""
+    store = FakeFirestore()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=workers))
+    server.add_generic_rpc_handlers((_handlers(store),))
+    port = server.add_insecure_port(f"{host}:{port}")
+    server.start()
+    return server, f"{host}:{port}", store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake Firestore API")
+    parser.add_argument("--port", type=int, default=8086)
+    parser.add_argument("--rpc-latency", type=float, default=CONFIG["rpc_latency"], help="Seconds added to every RPC")
+    args = parser.parse_args()
+    CONFIG.update(rpc_latency=args.rpc_latency)
+
+    server, address, _ = start_fake_firestore(port=args.port)
+    print(f"Fake Firestore API listening on {address}")
+    server.wait_for_termination()
@@ -0,0 +1,95 @@
+"""
+is_tracked lookup latency: the in-memory index versus a Firestore read, against the local emulator.
+
+Seeds --docs tracked URLs, loads them into a TrackedIndex, then times
+lookups of tracked and untracked URLs both ways. Finally it tracks new
+pairs through Firestore and measures how long the snapshot listener takes
+to make each one visible in the index.
+
+Start the emulator first, then point the benchmark at it:
+    gcloud emulators firestore start --host-port=127.0.0.1:8080
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python benchmarks/index_lookup.py --docs 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.cloud import firestore
+
+from index import TrackedIndex
+from tracking import encode_url, lookup_tracked, track_url_email, track_url_emails_batch
+from track_latency import summarize
+
+
+def timed(fn, urls: list[str]) -> dict:
+    samples = []
+    for url in urls:
+        started = time.perf_counter()
+        fn(url)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def visibility_lag(index: TrackedIndex, db, urls: list[str], timeout: float = 10) -> dict:
+    """Seconds from a tracked write returning until the listener has applied it."""
+    samples = []
+    for url in urls:
+        track_url_email(db, url, "lag@example.com")
+        started = time.perf_counter()
+        # Read the private maps so the bench's own lookups do not count as hits
+        while time.perf_counter() - started < timeout:
+            with index._lock:
+                if "lag@example.com" in index._emails.get(encode_url(url), ()):
+                    break
+            time.sleep(0.0005)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--project", default="tracker-bench")
+    args = parser.parse_args()
+
+    if not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST to the address of a running Firestore emulator")
+
+    db = firestore.Client(project=args.project)
+    run_id = uuid.uuid4().hex[:8]
+    urls = [f"https://bench.example/{run_id}/{i}" for i in range(args.docs)]
+    track_url_emails_batch(db, [(url, "seed@example.com") for url in urls])
+
+    index = TrackedIndex()
+    started = time.perf_counter()
+    loaded = index.start(db, timeout=120)
+    load_seconds = time.perf_counter() - started
+
+    tracked = [urls[i % len(urls)] for i in range(args.lookups)]
+    untracked = [f"https://bench.example/{run_id}/missing/{i}" for i in range(args.lookups)]
+    report = {
+        "docs": args.docs,
+        "index_loaded": loaded,
+        "load_ms": round(load_seconds * 1000, 1),
+        "tracked_url": {
+            "index": timed(lambda url: index.lookup(url, "seed@example.com"), tracked),
+            "firestore": timed(lambda url: lookup_tracked(db, url, "seed@example.com"), tracked)
+        },
+        "untracked_url": {
+            "index": timed(lambda url: index.lookup(url), untracked),
+            "firestore": timed(lambda url: lookup_tracked(db, url), untracked)
+        },
+        "write_to_index_visible": visibility_lag(
+            index, db, [f"https://bench.example/{run_id}/lag/{i}" for i in range(50)]
+        ),
+        "index": index.stats()
+    }
+    index.stop()
+    print(json.dumps(report, indent=2))
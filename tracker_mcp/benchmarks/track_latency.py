@@ -0,0 +1,136 @@
+"""
+Per-call latency and round trips of track_url_email.
+
+Compares the original read-then-set implementation, the create-first one
+(create(), then a transaction when the URL exists) and the current
+read-first one for new URLs, new emails on existing URLs and repeated
+pairs, then checks that concurrent calls for one URL keep every email.
+
+Against the local Firestore emulator:
+    gcloud emulators firestore start --host-port=127.0.0.1:8080
+    FIRESTORE_EMULATOR_HOST=127.0.0.1:8080 python benchmarks/track_latency.py --calls 200
+
+Or against benchmarks/fake_firestore.py, which also counts the RPCs of each
+call; --rpc-latency models the round trip to a Firestore region:
+    python benchmarks/track_latency.py --fake --rpc-latency 0.02 --calls 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.api_core.exceptions import AlreadyExists
+from google.cloud import firestore
+
+from percentiles import percentile
+from tracking import COLLECTION, _add_email, encode_url, new_document, track_url_email
+
+
+def summarize(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3)
+    }
+
+
+def legacy_track(db, url: str, email: str) -> None:
+    """The previous implementation: get() the document, then set() the whole of it."""
+    doc_ref = db.collection(COLLECTION).document(encode_url(url))
+    doc = doc_ref.get()
+    if doc.exists:
+        data = doc.to_dict()
+        if email not in data.get('emails', []):
+            data['emails'].append(email)
+            data['is_new'] = True
+            doc_ref.set(data)
+    else:
+        doc_ref.set({'url': url, 'emails': [email], 'is_new': True})
+
+
+def create_first_track(db, url: str, email: str) -> bool:
+    """The create-first implementation: create(), and a transaction once the URL exists."""
+    doc_ref = db.collection(COLLECTION).document(encode_url(url))
+    try:
+        doc_ref.create(new_document(url, email))
+        return True
+    except AlreadyExists:
+        return _add_email(db.transaction(), doc_ref, url, email)
+
+
+IMPLEMENTATIONS = {
+    "legacy_get_set": legacy_track,
+    "create_first": create_first_track,
+    "read_first": track_url_email
+}
+
+
+def timed(fn, db, pairs: list[tuple[str, str]], rpcs: Counter | None) -> dict:
+    samples = []
+    if rpcs is not None:
+        rpcs.clear()
+    for url, email in pairs:
+        started = time.perf_counter()
+        fn(db, url, email)
+        samples.append(time.perf_counter() - started)
+    summary = summarize(samples)
+    if rpcs is not None:
+        summary["rpcs_per_call"] = round(sum(rpcs.values()) / len(pairs), 2)
+    return summary
+
+
+def bench(db, name: str, fn, calls: int, run_id: str, rpcs: Counter | None = None) -> dict:
+    urls = [f"https://bench.example/{run_id}/{name}/{i}" for i in range(calls)]
+    return {
+        "new_url": timed(fn, db, [(url, "first@example.com") for url in urls], rpcs),
+        "new_email": timed(fn, db, [(url, "second@example.com") for url in urls], rpcs),
+        "repeat": timed(fn, db, [(url, "second@example.com") for url in urls], rpcs)
+    }
+
+
+def lost_updates(db, fn, writers: int, run_id: str, name: str) -> int:
+    """Track distinct emails for one URL from concurrent writers and count the emails that went missing."""
+    url = f"https://bench.example/{run_id}/{name}/contended"
+    emails = [f"writer{i}@example.com" for i in range(writers)]
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        list(pool.map(lambda email: fn(db, url, email), emails))
+    stored = db.collection(COLLECTION).document(encode_url(url)).get().to_dict()["emails"]
+    return len(set(emails) - set(stored))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--writers", type=int, default=16, help="Concurrent writers for the lost-update check")
+    parser.add_argument("--project", default="tracker-bench")
+    parser.add_argument("--fake", action="store_true", help="Run against benchmarks/fake_firestore.py")
+    parser.add_argument("--rpc-latency", type=float, default=0.0, help="Seconds added to every fake RPC")
+    args = parser.parse_args()
+
+    rpcs = None
+    if args.fake:
+        from fake_firestore import CONFIG, start_fake_firestore
+        CONFIG.update(rpc_latency=args.rpc_latency)
+        server, address, store = start_fake_firestore()
+        os.environ["FIRESTORE_EMULATOR_HOST"] = address
+        rpcs = store.rpcs
+    elif not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        sys.exit("Set FIRESTORE_EMULATOR_HOST to the address of a running Firestore emulator, or pass --fake")
+
+    db = firestore.Client(project=args.project)
+    run_id = uuid.uuid4().hex[:8]
+    report = {"calls": args.calls, "rpc_latency_ms": args.rpc_latency * 1000 if args.fake else None}
+    for name, fn in IMPLEMENTATIONS.items():
+        report[name] = bench(db, name, fn, args.calls, run_id, rpcs)
+    report["lost_emails"] = {
+        name: lost_updates(db, fn, args.writers, run_id, name) for name, fn in IMPLEMENTATIONS.items()
+    }
+    print(json.dumps(report, indent=2))
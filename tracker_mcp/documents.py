@@ -0,0 +1,65 @@
+"""
+Backend-neutral helpers for tracked URL documents: IDs, fields, page cursors and timestamps.
+"""
+
+import base64
+import json
+import re
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+# Fields of a url_tracking document that get_tracked_data can return
+TRACKED_FIELDS = ("url", "domain", "emails", "is_new", "created_at", "updated_at")
+
+
+def check_fields(fields: list[str] | None) -> None:
+    """Raise ValueError unless fields is None or a subset of TRACKED_FIELDS."""
+    if fields is not None and any(field not in TRACKED_FIELDS for field in fields):
+        raise ValueError(f"fields must be a subset of {list(TRACKED_FIELDS)}")
+
+
+def encode_url(url: str) -> str:
+    """Encode URL to make it a valid Firestore document ID (also the SQLite key of a URL)."""
+    # Remove protocol and special characters
+    clean_url = re.sub(r'^https?://', '', url)
+    clean_url = re.sub(r'[^a-zA-Z0-9-]', '_', clean_url)
+    # Ensure it's not too long (Firestore has a limit)
+    return clean_url[:1500]
+
+
+def url_domain(url: str) -> str:
+    """Host of a URL (or of a bare domain) in lower case, without a leading www."""
+    host = urlsplit(url if "//" in url else f"//{url}").hostname or ""
+    return host.removeprefix("www.")
+
+
+def encode_cursor(doc_id: str, updated_at: datetime | None = None) -> str:
+    """Opaque page cursor pointing just past the given document."""
+    position = {"id": doc_id}
+    if updated_at is not None:
+        position["updated_at"] = updated_at.isoformat()
+    return base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Position encoded by encode_cursor; raises ValueError for anything else."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if not isinstance(position, dict) or not isinstance(position.get("id"), str):
+            raise ValueError("Invalid cursor")
+        if "updated_at" in position:
+            position["updated_at"] = datetime.fromisoformat(position["updated_at"])
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    return position
+
+
+def json_value(value):
+    """A field value in JSON-serializable form (timestamps as ISO 8601)."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def parse_timestamp(value: str) -> datetime:
+    """ISO 8601 date or timestamp; naive values are taken as UTC."""
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
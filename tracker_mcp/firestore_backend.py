@@ -0,0 +1,67 @@
+"""
+Firestore storage for the tracker MCP tools.
+"""
+
+import logging
+from datetime import datetime
+
+from backend import TrackerBackend
+from index import TrackedIndex
+from tracking import lookup_tracked, query_tracked, track_url_email, track_url_emails_batch
+
+logger = logging.getLogger("tracker-mcp")
+
+
+class FirestoreBackend(TrackerBackend):
+    """Tracked URLs in the url_tracking Firestore collection.
+
+    With use_index, lookups are served from a TrackedIndex kept current by
+    a snapshot listener, and read Firestore only while it is not ready.
+    """
+
+    name = "firestore"
+
+    def __init__(self, db, use_index: bool = True, load_timeout: float = 10):
+        self.db = db
+        self.use_index = use_index
+        self.load_timeout = load_timeout
+        self.index = TrackedIndex()
+
+    def start(self) -> None:
+        if self.use_index and not self.index.start(self.db, self.load_timeout):
+            logger.warning("Tracked URL index still loading, is_tracked reads Firestore until it is ready")
+
+    def close(self) -> None:
+        self.index.stop()
+
+    def track(self, url: str, email: str) -> bool:
+        added = track_url_email(self.db, url, email)
+        if self.use_index:
+            self.index.add(url, email)
+        return added
+
+    def track_batch(self, pairs: list[tuple[str, str]], max_parallel: int = 4) -> list[dict]:
+        items = track_url_emails_batch(self.db, pairs, max_parallel=max_parallel)
+        if self.use_index:
+            for item in items:
+                if item["status"] != "error":
+                    self.index.add(item["url"], item["email"])
+        return items
+
+    def lookup(self, url: str | None = None, email: str | None = None) -> dict:
+        result = self.index.lookup(url, email) if self.use_index else None
+        if result is not None:
+            return {**result, "source": "index"}
+        return {**lookup_tracked(self.db, url, email), "source": "firestore"}
+
+    def query(self, page_size: int = 100, cursor: str | None = None, fields: list[str] | None = None,
+              is_new: bool | None = None, domain: str | None = None,
+              updated_after: datetime | None = None,
+              updated_before: datetime | None = None) -> tuple[list[dict], str | None]:
+        return query_tracked(
+            self.db, page_size=page_size, cursor=cursor, fields=fields, is_new=is_new, domain=domain,
+            updated_after=updated_after, updated_before=updated_before
+        )
+
+    def stats(self) -> dict:
+        return {"tracked_index": {"enabled": self.use_index, **self.index.stats()}}
@@ -0,0 +1,192 @@
+"""
+In-memory index of tracked URLs and emails, kept current by a Firestore snapshot listener.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from google.cloud.firestore_v1.watch import ChangeType
+
+from documents import encode_url
+from percentiles import percentile
+from tracking import COLLECTION
+
+logger = logging.getLogger("tracker-mcp")
+
+
+class TrackedIndex:
+    """Answers "is this URL/email tracked?" from memory.
+
+    start() registers an on_snapshot listener on the url_tracking
+    collection: its first snapshot loads every document once, and later
+    snapshots deliver only the changed documents, which are applied as
+    they arrive. Emails are only ever added to a document, so a change
+    merges into the known emails rather than replacing them; an email
+    this process just wrote (add()) therefore cannot be undone by a
+    snapshot that was taken before the write.
+
+    Lookups return None while the index is not usable (still loading, or
+    the listener stopped), so callers can fall back to Firestore. A
+    stopped listener is restarted by the next lookup, at most once every
+    restart_interval seconds, and the new listener's first snapshot
+    replaces the whole index.
+    """
+
+    def __init__(self, restart_interval: float = 30, window: int = 512):
+        self.restart_interval = restart_interval
+        self._lock = threading.Lock()
+        self._urls: dict[str, str] = {}
+        self._emails: dict[str, set[str]] = {}
+        self._by_email: dict[str, set[str]] = {}
+        self._db = None
+        self._watch = None
+        self._generation = 0
+        self._loaded = threading.Event()
+        self._started_at = None
+        self._last_start = 0.0
+        self._lags = deque(maxlen=window)
+        self.load_seconds = None
+        self.snapshots = 0
+        self.changes = 0
+        self.restarts = 0
+        self.last_read_time = None
+        self.last_snapshot_at = None
+        self.hits = 0
+        self.fallbacks = 0
+
+    def start(self, db, timeout: float = 30) -> bool:
+        """Start listening and wait up to timeout seconds for the initial load; return whether it finished."""
+        self._db = db
+        self._listen()
+        return self._loaded.wait(timeout)
+
+    def _listen(self) -> None:
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._loaded.clear()
+        self._started_at = self._last_start = time.monotonic()
+        self._watch = self._db.collection(COLLECTION).on_snapshot(
+            lambda docs, changes, read_time: self._on_snapshot(generation, docs, changes, read_time)
+        )
+
+    def stop(self) -> None:
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+
+    @property
+    def listening(self) -> bool:
+        return self._watch is not None and self._watch.is_active
+
+    @property
+    def ready(self) -> bool:
+        """True when lookups are answered from memory."""
+        return self._loaded.is_set() and self.listening
+
+    def _on_snapshot(self, generation: int, docs: list, changes: list, read_time: datetime) -> None:
+        received = datetime.now(timezone.utc)
+        with self._lock:
+            if generation != self._generation:
+                return
+            if not self._loaded.is_set():
+                # First snapshot of this listener: the full collection
+                self._urls, self._emails, self._by_email = {}, {}, {}
+                for doc in docs:
+                    data = doc.to_dict() or {}
+                    self._merge(doc.id, data.get('url', ''), data.get('emails') or [])
+                self.load_seconds = time.monotonic() - self._started_at
+                self._loaded.set()
+                logger.info(f"Loaded {len(self._urls)} tracked URLs into memory in {self.load_seconds:.2f}s")
+            else:
+                for change in changes:
+                    doc = change.document
+                    if change.type == ChangeType.REMOVED:
+                        self._remove(doc.id)
+                    else:
+                        data = doc.to_dict() or {}
+                        self._merge(doc.id, data.get('url', ''), data.get('emails') or [])
+                    if doc.update_time is not None:
+                        self._lags.append(max(0.0, (received - doc.update_time).total_seconds()))
+                self.changes += len(changes)
+            self.snapshots += 1
+            self.last_read_time = read_time
+            self.last_snapshot_at = time.monotonic()
+
+    def _merge(self, doc_id: str, url: str, emails: list[str]) -> None:
+        if url or doc_id not in self._urls:
+            self._urls[doc_id] = url
+        known = self._emails.setdefault(doc_id, set())
+        for email in emails:
+            if email not in known:
+                known.add(email)
+                self._by_email.setdefault(email, set()).add(doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        self._urls.pop(doc_id, None)
+        for email in self._emails.pop(doc_id, ()):
+            doc_ids = self._by_email.get(email)
+            if doc_ids is not None:
+                doc_ids.discard(doc_id)
+                if not doc_ids:
+                    del self._by_email[email]
+
+    def add(self, url: str, email: str) -> None:
+        """Record a pair this process has just tracked, ahead of the listener delivering it."""
+        with self._lock:
+            self._merge(encode_url(url), url, [email])
+
+    def lookup(self, url: str | None = None, email: str | None = None) -> dict | None:
+        """Whether a URL, an email, or an email for a URL is tracked; None when the index is not ready.
+
+        See tracking.lookup_tracked for the fields of the result.
+        """
+        if not self.ready:
+            if (self._db is not None and not self.listening
+                    and time.monotonic() - self._last_start >= self.restart_interval):
+                logger.warning("Tracked URL listener stopped, restarting it")
+                self.restarts += 1
+                self._listen()
+            self.fallbacks += 1
+            return None
+        self.hits += 1
+        with self._lock:
+            result = {}
+            if url is not None:
+                doc_id = encode_url(url)
+                result["url_tracked"] = doc_id in self._urls
+                if email is not None:
+                    result["email_tracked"] = email in self._emails.get(doc_id, ())
+            else:
+                doc_ids = self._by_email.get(email, ())
+                result["email_tracked"] = bool(doc_ids)
+                result["urls"] = sorted(self._urls[doc_id] for doc_id in doc_ids)
+        return result
+
+    def stats(self) -> dict:
+        lags = sorted(self._lags)
+        since_snapshot = time.monotonic() - self.last_snapshot_at if self.last_snapshot_at is not None else None
+        return {
+            "ready": self.ready,
+            "listening": self.listening,
+            "urls": len(self._urls),
+            "emails": len(self._by_email),
+            "load_ms": round(self.load_seconds * 1000, 1) if self.load_seconds is not None else None,
+            "snapshots": self.snapshots,
+            "changes": self.changes,
+            "restarts": self.restarts,
+            "last_read_time": self.last_read_time.isoformat() if self.last_read_time else None,
+            "seconds_since_snapshot": round(since_snapshot, 3) if since_snapshot is not None else None,
+            "listener_lag_ms": {
+                "samples": len(lags),
+                "p50": round(percentile(lags, 50) * 1000, 1) if lags else None,
+                "p95": round(percentile(lags, 95) * 1000, 1) if lags else None,
+                "max": round(lags[-1] * 1000, 1) if lags else None
+            },
+            "lookups": self.hits + self.fallbacks,
+            "hits": self.hits,
+            "fallbacks": self.fallbacks
+        }
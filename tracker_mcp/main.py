@@ -5,11 +5,10 @@ from mcp.server import Server
 from mcp.types import Tool, TextContent
 import os
 from dotenv import load_dotenv
-import firebase_admin
-from firebase_admin import credentials, firestore
 import json
-import base64
-import re
+import asyncio
+from backend import TrackerBackend
+from documents import TRACKED_FIELDS, parse_timestamp
 
 # Load environment variables
 load_dotenv()
@@ -18,21 +17,50 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("tracker-mcp")
 
-# Initialize Firebase
-cred = credentials.Certificate(os.getenv('FIREBASE_CREDENTIALS_PATH'))
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+# Storage backend: firestore, or sqlite for a local database file
+TRACKER_BACKEND = os.getenv('TRACKER_BACKEND', 'firestore').lower()
+TRACKER_SQLITE_PATH = os.getenv('TRACKER_SQLITE_PATH', 'tracker.db')
 
-def encode_url(url: str) -> str:
-    """Encode URL to make it a valid Firestore document ID."""
-    # Remove protocol and special characters
-    clean_url = re.sub(r'^https?://', '', url)
-    clean_url = re.sub(r'[^a-zA-Z0-9-]', '_', clean_url)
-    # Ensure it's not too long (Firestore has a limit)
-    return clean_url[:1500]
+# WriteBatch commits track_url_emails_batch runs at the same time
+BATCH_COMMIT_PARALLELISM = int(os.getenv('BATCH_COMMIT_PARALLELISM', '4'))
+
+# Documents get_tracked_data returns per page by default, and at most
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Firestore backend: in-memory index of tracked URLs and emails behind is_tracked, kept current by a snapshot listener
+TRACKED_INDEX = os.getenv('TRACKED_INDEX', 'true').lower() == 'true'
+TRACKED_INDEX_LOAD_TIMEOUT = float(os.getenv('TRACKED_INDEX_LOAD_TIMEOUT', '10'))
+
+# Created on first use, so only the configured backend's dependencies are loaded
+backend: TrackerBackend | None = None
 
 app = Server("tracker-mcp")
 
+def get_backend() -> TrackerBackend:
+    """Return the configured storage backend, creating it on first use."""
+    global backend
+    if backend is None:
+        if TRACKER_BACKEND == "sqlite":
+            from sqlite_backend import SqliteBackend
+            backend = SqliteBackend(TRACKER_SQLITE_PATH)
+        elif TRACKER_BACKEND == "firestore":
+            import firebase_admin
+            from firebase_admin import credentials, firestore
+            from firestore_backend import FirestoreBackend
+
+            # Initialize Firebase
+            cred = credentials.Certificate(os.getenv('FIREBASE_CREDENTIALS_PATH'))
+            firebase_admin.initialize_app(cred)
+            backend = FirestoreBackend(
+                firestore.client(),
+                use_index=TRACKED_INDEX,
+                load_timeout=TRACKED_INDEX_LOAD_TIMEOUT
+            )
+        else:
+            raise ValueError(f"Unknown TRACKER_BACKEND: {TRACKER_BACKEND} (use firestore or sqlite)")
+    return backend
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available tools."""
@@ -55,9 +83,100 @@ async def list_tools() -> list[Tool]:
                 "required": ["url", "email"]
             }
         ),
+        Tool(
+            name="track_url_emails_batch",
+            description="Track many URLs and their associated emails in one call",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "pairs": {
+                        "type": "array",
+                        "description": "URL/email pairs to track",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "url": {
+                                    "type": "string",
+                                    "description": "The URL to track"
+                                },
+                                "email": {
+                                    "type": "string",
+                                    "description": "The email associated with the URL"
+                                }
+                            },
+                            "required": ["url", "email"]
+                        }
+                    }
+                },
+                "required": ["pairs"]
+            }
+        ),
+        Tool(
+            name="is_tracked",
+            description="Check whether a URL, an email, or an email for a URL is already tracked",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "url": {
+                        "type": "string",
+                        "description": "The URL to check"
+                    },
+                    "email": {
+                        "type": "string",
+                        "description": "The email to check, for the given URL or across all URLs"
+                    }
+                }
+            }
+        ),
         Tool(
             name="get_tracked_data",
-            description="Get all tracked URLs and emails",
+            description="Get one page of tracked URLs and emails, optionally filtered",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "page_size": {
+                        "type": "integer",
+                        "description": f"Documents per page (default {DEFAULT_PAGE_SIZE}, max {MAX_PAGE_SIZE})",
+                        "minimum": 1,
+                        "maximum": MAX_PAGE_SIZE
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "next_cursor of the previous page, to fetch the page after it"
+                    },
+                    "fields": {
+                        "type": "array",
+                        "description": "Fields to return (default: all)",
+                        "items": {"type": "string", "enum": list(TRACKED_FIELDS)}
+                    },
+                    "is_new": {
+                        "type": "boolean",
+                        "description": "Only return documents with this is_new value"
+                    },
+                    "domain": {
+                        "type": "string",
+                        "description": "Only return URLs on this domain (e.g. example.com)"
+                    },
+                    "updated_after": {
+                        "type": "string",
+                        "description": "Only return documents updated at or after this ISO 8601 time"
+                    },
+                    "updated_before": {
+                        "type": "string",
+                        "description": "Only return documents updated before this ISO 8601 time"
+                    },
+                    "output_format": {
+                        "type": "string",
+                        "description": "text (one line per URL) or json",
+                        "enum": ["text", "json"],
+                        "default": "text"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="get_tracker_metrics",
+            description="Get storage backend counters, with index staleness and listener lag for Firestore",
             inputSchema={
                 "type": "object",
                 "properties": {}
@@ -72,37 +191,77 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent]:
             url = arguments.get("url")
             email = arguments.get("email")
             
-            # Encode URL for document ID
-            doc_id = encode_url(url)
-            
-            # Get or create document for URL
-            doc_ref = db.collection('url_tracking').document(doc_id)
-            doc = doc_ref.get()
-            
-            if doc.exists:
-                # URL exists, check if email is new
-                data = doc.to_dict()
-                if email not in data.get('emails', []):
-                    data['emails'].append(email)
-                    data['is_new'] = True
-                    doc_ref.set(data)
-            else:
-                # URL is new, create document
-                doc_ref.set({
-                    'url': url,
-                    'emails': [email],
-                    'is_new': True
-                })
+            # Create the document for a new URL, or add the email to an existing one
+            get_backend().track(url, email)
             
             return [TextContent(type="text", text=f"Successfully tracked URL: {url} with email: {email}")]
                 
+        elif name == "track_url_emails_batch":
+            pairs = arguments.get("pairs")
+            if not isinstance(pairs, list) or not all(
+                isinstance(pair, dict) and pair.get("url") and pair.get("email") for pair in pairs
+            ):
+                raise ValueError("pairs must be a list of objects with url and email")
+
+            items = get_backend().track_batch(
+                [(pair["url"], pair["email"]) for pair in pairs],
+                max_parallel=BATCH_COMMIT_PARALLELISM
+            )
+            summary = {status: 0 for status in ("new_url", "new_email", "existing", "error")}
+            for item in items:
+                summary[item["status"]] += 1
+            return [TextContent(type="text", text=json.dumps({"summary": summary, "items": items}, indent=2))]
+
+        elif name == "is_tracked":
+            url = arguments.get("url") or None
+            email = arguments.get("email") or None
+            if not url and not email:
+                raise ValueError("url or email is required")
+
+            # With Firestore, answered from memory unless the index is not ready
+            result = get_backend().lookup(url, email)
+            return [TextContent(type="text", text=json.dumps(result, indent=2))]
+
+        elif name == "get_tracker_metrics":
+            metrics = {"backend": get_backend().name, **get_backend().stats()}
+            return [TextContent(type="text", text=json.dumps(metrics, indent=2))]
+
         elif name == "get_tracked_data":
-            # Get all documents
-            docs = db.collection('url_tracking').stream()
+            page_size = int(arguments.get("page_size") or DEFAULT_PAGE_SIZE)
+            if not 1 <= page_size <= MAX_PAGE_SIZE:
+                raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+            updated_after = arguments.get("updated_after")
+            updated_before = arguments.get("updated_before")
+
+            # Read one page, filtered and projected by the backend
+            items, next_cursor = get_backend().query(
+                page_size=page_size,
+                cursor=arguments.get("cursor"),
+                fields=arguments.get("fields"),
+                is_new=arguments.get("is_new"),
+                domain=arguments.get("domain"),
+                updated_after=parse_timestamp(updated_after) if updated_after else None,
+                updated_before=parse_timestamp(updated_before) if updated_before else None
+            )
+
+            if arguments.get("output_format") == "json":
+                return [TextContent(type="text", text=json.dumps({"items": items, "next_cursor": next_cursor}, indent=2))]
+
             output = []
-            for doc in docs:
-                data = doc.to_dict()
-                output.append(f"URL: {data['url']}, Emails: {', '.join(data['emails'])}, New: {data['is_new']}")
+            for item in items:
+                parts = []
+                if "url" in item:
+                    parts.append(f"URL: {item['url']}")
+                if "emails" in item:
+                    parts.append(f"Emails: {', '.join(item['emails'])}")
+                if "is_new" in item:
+                    parts.append(f"New: {item['is_new']}")
+                parts.extend(
+                    f"{field}: {item[field]}" for field in ("domain", "created_at", "updated_at") if field in item
+                )
+                output.append(", ".join(parts or [f"ID: {item['id']}"]))
+            if next_cursor:
+                output.append(f"Next cursor: {next_cursor}")
             return [TextContent(type="text", text="\n".join(output))]
                 
         else:
@@ -114,14 +273,19 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent]:
 
 async def main():
     from mcp.server.stdio import stdio_server
-    
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+
+    # Loads the Firestore is_tracked index; lookups read Firestore until it finishes
+    await asyncio.to_thread(get_backend().start)
+
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(
+                read_stream,
+                write_stream,
+                app.create_initialization_options()
+            )
+    finally:
+        get_backend().close()
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,12 @@
+"""
+Latency percentiles shared by the server's metrics and its benchmarks.
+"""
+
+import math
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted samples, or 0.0 when there are none."""
+    if not samples:
+        return 0.0
+    return samples[max(0, min(len(samples) - 1, math.ceil(pct / 100 * len(samples)) - 1))]
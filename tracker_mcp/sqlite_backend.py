@@ -0,0 +1,228 @@
+"""
+Local SQLite storage for the tracker MCP tools.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from backend import TrackerBackend
+from documents import (
+    TRACKED_FIELDS, check_fields, decode_cursor, encode_cursor, encode_url, json_value, url_domain
+)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Bound parameters per IN (...) list, well under SQLite's variable limit
+_MAX_PARAMS = 500
+
+
+def _now() -> int:
+    return time.time_ns() // 1000
+
+
+def _from_micros(value: int) -> datetime:
+    return _EPOCH + value * _MICROSECOND
+
+
+def _to_micros(value: datetime) -> int:
+    # Exact, so a cursor position compares equal to the row it came from
+    return (value - _EPOCH) // _MICROSECOND
+
+
+class SqliteBackend(TrackerBackend):
+    """Tracked URLs in a local SQLite database in WAL mode.
+
+    A URL is a row of urls keyed by encode_url, its emails are rows of
+    url_emails. Timestamps are integer microseconds since the epoch. The
+    connection is shared between threads and guarded by a lock, and every
+    tool call is one transaction: BEGIN IMMEDIATE takes the write lock up
+    front, so concurrent servers on the same file serialize their writes
+    instead of losing emails. WAL with synchronous=NORMAL keeps commits
+    off fsync; a commit survives a crash of the process but not a power
+    loss.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS urls ("
+                "id TEXT PRIMARY KEY, "
+                "url TEXT NOT NULL, "
+                "domain TEXT NOT NULL, "
+                "is_new INTEGER NOT NULL, "
+                "created_at INTEGER NOT NULL, "
+                "updated_at INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS url_emails ("
+                "url_id TEXT NOT NULL REFERENCES urls (id), "
+                "email TEXT NOT NULL, "
+                "added_at INTEGER NOT NULL, "
+                "UNIQUE (url_id, email))"
+            )
+            # The primary key and UNIQUE constraint already index lookups by URL and URL + email
+            self._conn.execute("CREATE INDEX IF NOT EXISTS url_emails_email ON url_emails (email)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS urls_updated_at ON urls (updated_at, id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS urls_domain ON urls (domain, updated_at, id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS urls_is_new ON urls (is_new, updated_at, id)")
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _track(self, url: str, email: str, now: int) -> str:
+        doc_id = encode_url(url)
+        created = self._conn.execute(
+            "INSERT OR IGNORE INTO urls (id, url, domain, is_new, created_at, updated_at) VALUES (?, ?, ?, 1, ?, ?)",
+            (doc_id, url, url_domain(url), now, now)
+        ).rowcount
+        added = self._conn.execute(
+            "INSERT OR IGNORE INTO url_emails (url_id, email, added_at) VALUES (?, ?, ?)",
+            (doc_id, email, now)
+        ).rowcount
+        if not added:
+            return "existing"
+        if created:
+            return "new_url"
+        self._conn.execute(
+            "UPDATE urls SET domain = ?, is_new = 1, updated_at = ? WHERE id = ?",
+            (url_domain(url), now, doc_id)
+        )
+        return "new_email"
+
+    def track(self, url: str, email: str) -> bool:
+        with self._transaction():
+            return self._track(url, email, _now()) != "existing"
+
+    def track_batch(self, pairs: list[tuple[str, str]], max_parallel: int = 4) -> list[dict]:
+        """Track every pair in a single transaction; SQLite has one writer, so max_parallel is unused."""
+        statuses = [{"url": url, "email": email} for url, email in pairs]
+        try:
+            with self._transaction():
+                now = _now()
+                for item in statuses:
+                    item["status"] = self._track(item["url"], item["email"], now)
+        except sqlite3.Error as error:
+            # The transaction was rolled back, so only pairs that were already tracked are unaffected
+            for item in statuses:
+                if item.get("status") != "existing":
+                    item.update(status="error", error=str(error))
+        return statuses
+
+    def lookup(self, url: str | None = None, email: str | None = None) -> dict:
+        with self._lock:
+            if url is not None:
+                doc_id = encode_url(url)
+                result = {"url_tracked": self._conn.execute(
+                    "SELECT 1 FROM urls WHERE id = ?", (doc_id,)
+                ).fetchone() is not None}
+                if email is not None:
+                    result["email_tracked"] = self._conn.execute(
+                        "SELECT 1 FROM url_emails WHERE url_id = ? AND email = ?", (doc_id, email)
+                    ).fetchone() is not None
+            else:
+                urls = [row[0] for row in self._conn.execute(
+                    "SELECT urls.url FROM url_emails JOIN urls ON urls.id = url_emails.url_id "
+                    "WHERE url_emails.email = ? ORDER BY urls.url",
+                    (email,)
+                )]
+                result = {"email_tracked": bool(urls), "urls": urls}
+        return {**result, "source": "sqlite"}
+
+    def query(self, page_size: int = 100, cursor: str | None = None, fields: list[str] | None = None,
+              is_new: bool | None = None, domain: str | None = None,
+              updated_after: datetime | None = None,
+              updated_before: datetime | None = None) -> tuple[list[dict], str | None]:
+        check_fields(fields)
+
+        where, params = [], []
+        if is_new is not None:
+            where.append("is_new = ?")
+            params.append(int(is_new))
+        if domain:
+            where.append("domain = ?")
+            params.append(url_domain(domain))
+        by_time = updated_after is not None or updated_before is not None
+        if updated_after is not None:
+            where.append("updated_at >= ?")
+            params.append(_to_micros(updated_after))
+        if updated_before is not None:
+            where.append("updated_at < ?")
+            params.append(_to_micros(updated_before))
+        if cursor:
+            position = decode_cursor(cursor)
+            if by_time != ("updated_at" in position):
+                raise ValueError("cursor was issued for a different date filter")
+            if by_time:
+                where.append("(updated_at, id) > (?, ?)")
+                params.extend([_to_micros(position["updated_at"]), position["id"]])
+            else:
+                where.append("id > ?")
+                params.append(position["id"])
+
+        sql = "SELECT id, url, domain, is_new, created_at, updated_at FROM urls"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY updated_at, id" if by_time else " ORDER BY id"
+        keep = fields if fields is not None else TRACKED_FIELDS
+
+        with self._lock:
+            rows = self._conn.execute(sql + " LIMIT ?", (*params, page_size + 1)).fetchall()
+            next_cursor = None
+            if len(rows) > page_size:
+                rows = rows[:page_size]
+                last = rows[-1]
+                next_cursor = encode_cursor(last[0], _from_micros(last[5]) if by_time else None)
+
+            emails: dict[str, list[str]] = {}
+            if "emails" in keep:
+                doc_ids = [row[0] for row in rows]
+                for i in range(0, len(doc_ids), _MAX_PARAMS):
+                    chunk = doc_ids[i:i + _MAX_PARAMS]
+                    for doc_id, email in self._conn.execute(
+                        f"SELECT url_id, email FROM url_emails WHERE url_id IN ({', '.join('?' * len(chunk))}) "
+                        "ORDER BY rowid",
+                        chunk
+                    ):
+                        emails.setdefault(doc_id, []).append(email)
+
+        items = []
+        for doc_id, url, row_domain, row_is_new, created_at, updated_at in rows:
+            data = {
+                "url": url,
+                "domain": row_domain,
+                "emails": emails.get(doc_id, []),
+                "is_new": bool(row_is_new),
+                "created_at": _from_micros(created_at),
+                "updated_at": _from_micros(updated_at)
+            }
+            items.append({"id": doc_id, **{field: json_value(data[field]) for field in keep}})
+        return items, next_cursor
+
+    def stats(self) -> dict:
+        with self._lock:
+            urls = self._conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+            pairs = self._conn.execute("SELECT COUNT(*) FROM url_emails").fetchone()[0]
+        return {"sqlite": {"path": self.path, "urls": urls, "tracked_pairs": pairs}}
@@ -0,0 +1,233 @@
+"""
+Firestore operations behind the tracker MCP tools.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition
+from google.cloud.firestore_v1.base_query import FieldFilter
+
+from documents import (
+    TRACKED_FIELDS, check_fields, decode_cursor, encode_cursor, encode_url, json_value, url_domain
+)
+
+COLLECTION = "url_tracking"
+
+
+def new_document(url: str, email: str) -> dict:
+    """Fields of a url_tracking document created for a first email."""
+    return {
+        'url': url,
+        'domain': url_domain(url),
+        'emails': [email],
+        'is_new': True,
+        'created_at': firestore.SERVER_TIMESTAMP,
+        'updated_at': firestore.SERVER_TIMESTAMP
+    }
+
+
+@firestore.transactional
+def _add_email(transaction, doc_ref, url: str, email: str) -> bool:
+    snapshot = doc_ref.get(transaction=transaction)
+    if not snapshot.exists:
+        transaction.set(doc_ref, new_document(url, email))
+        return True
+    if email in (snapshot.to_dict().get('emails') or []):
+        return False
+    transaction.set(doc_ref, {
+        'domain': url_domain(url),
+        'emails': firestore.ArrayUnion([email]),
+        'is_new': True,
+        'updated_at': firestore.SERVER_TIMESTAMP
+    }, merge=True)
+    return True
+
+
+def track_url_email(db, url: str, email: str) -> bool:
+    """Track one URL/email pair; return True if the email was not tracked for the URL yet.
+
+    The document's emails are read first, so an already tracked pair costs
+    that one read. Otherwise a single conditional write follows: create()
+    for a new URL, or an ArrayUnion update guarded by the read's update_time
+    for a new email. If another writer got in between, the precondition
+    fails and the pair goes through a transaction instead, which Firestore
+    retries on contention, so concurrent calls never lose an email.
+    """
+    doc_ref = db.collection(COLLECTION).document(encode_url(url))
+    snapshot = doc_ref.get(field_paths=['emails'])
+    try:
+        if not snapshot.exists:
+            doc_ref.create(new_document(url, email))
+            return True
+        if email in (snapshot.to_dict().get('emails') or []):
+            return False
+        doc_ref.update({
+            'domain': url_domain(url),
+            'emails': firestore.ArrayUnion([email]),
+            'is_new': True,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        }, option=db.write_option(last_update_time=snapshot.update_time))
+        return True
+    except (AlreadyExists, FailedPrecondition):
+        return _add_email(db.transaction(), doc_ref, url, email)
+
+
+# Firestore accepts at most 500 writes per batch commit
+MAX_BATCH_WRITES = 500
+
+
+def _commit(db, writes: list[tuple]) -> None:
+    batch = db.batch()
+    for doc_ref, fields in writes:
+        batch.set(doc_ref, fields, merge=True)
+    batch.commit()
+
+
+def track_url_emails_batch(db, pairs: list[tuple[str, str]], max_parallel: int = 4) -> list[dict]:
+    """Track many URL/email pairs with batched reads and writes.
+
+    Pairs are grouped by document ID, the existing documents are fetched
+    with get_all, and one merge write per changed document (ArrayUnion of
+    its new emails, is_new raised) is committed in WriteBatch chunks of up
+    to 500, at most max_parallel commits at a time. Returns one status per
+    input pair in order: new_url, new_email, existing or error.
+    """
+    collection = db.collection(COLLECTION)
+    groups: dict[str, dict] = {}
+    statuses: list[dict] = []
+    for url, email in pairs:
+        doc_id = encode_url(url)
+        group = groups.setdefault(doc_id, {"url": url, "emails": [], "items": []})
+        group["items"].append(len(statuses))
+        if email not in group["emails"]:
+            group["emails"].append(email)
+        statuses.append({"url": url, "email": email})
+
+    # Step 1: Read every affected document in as few round trips as possible
+    doc_ids = list(groups)
+    existing = {}
+    for i in range(0, len(doc_ids), MAX_BATCH_WRITES):
+        refs = [collection.document(doc_id) for doc_id in doc_ids[i:i + MAX_BATCH_WRITES]]
+        for snapshot in db.get_all(refs, field_paths=['emails']):
+            if snapshot.exists:
+                existing[snapshot.id] = set(snapshot.to_dict().get('emails') or [])
+
+    # Step 2: Work out each pair's status and the write its document needs
+    writes = []
+    for doc_id, group in groups.items():
+        known = existing.get(doc_id)
+        seen = set(known or ())
+        for index in group["items"]:
+            email = statuses[index]["email"]
+            if email in seen:
+                statuses[index]["status"] = "existing"
+            else:
+                statuses[index]["status"] = "new_url" if known is None and not seen else "new_email"
+                seen.add(email)
+
+        new_emails = [email for email in group["emails"] if email not in (known or ())]
+        if not new_emails:
+            continue
+        fields = {
+            'domain': url_domain(group["url"]),
+            'emails': firestore.ArrayUnion(new_emails),
+            'is_new': True,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        }
+        if known is None:
+            fields.update(url=group["url"], created_at=firestore.SERVER_TIMESTAMP)
+        writes.append((doc_id, collection.document(doc_id), fields))
+
+    # Step 3: Commit the writes in chunks, a few chunks in parallel
+    chunks = [writes[i:i + MAX_BATCH_WRITES] for i in range(0, len(writes), MAX_BATCH_WRITES)]
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+        futures = {
+            pool.submit(_commit, db, [(doc_ref, fields) for _, doc_ref, fields in chunk]): chunk
+            for chunk in chunks
+        }
+        for future, chunk in futures.items():
+            error = future.exception()
+            if error is None:
+                continue
+            for doc_id, _, _ in chunk:
+                for index in groups[doc_id]["items"]:
+                    if statuses[index]["status"] != "existing":
+                        statuses[index].update(status="error", error=str(error))
+    return statuses
+
+
+def query_tracked(db, page_size: int = 100, cursor: str | None = None, fields: list[str] | None = None,
+                  is_new: bool | None = None, domain: str | None = None,
+                  updated_after: datetime | None = None,
+                  updated_before: datetime | None = None) -> tuple[list[dict], str | None]:
+    """Return one page of tracked documents and the cursor of the next page (None on the last page).
+
+    Filters run in Firestore, pages are read with order_by + start_after +
+    limit, and fields limits the returned fields with a select() projection.
+    Without a date range pages are ordered by document ID; with one they are
+    ordered by updated_at and then document ID.
+    """
+    check_fields(fields)
+
+    query = db.collection(COLLECTION)
+    if is_new is not None:
+        query = query.where(filter=FieldFilter('is_new', '==', is_new))
+    if domain:
+        query = query.where(filter=FieldFilter('domain', '==', url_domain(domain)))
+    by_time = updated_after is not None or updated_before is not None
+    if updated_after is not None:
+        query = query.where(filter=FieldFilter('updated_at', '>=', updated_after))
+    if updated_before is not None:
+        query = query.where(filter=FieldFilter('updated_at', '<', updated_before))
+    if by_time:
+        query = query.order_by('updated_at')
+    query = query.order_by('__name__')
+
+    if fields is not None:
+        # The cursor needs updated_at when pages are ordered by it
+        query = query.select(sorted(set(fields) | ({'updated_at'} if by_time else set())))
+    if cursor:
+        position = decode_cursor(cursor)
+        if by_time != ("updated_at" in position):
+            raise ValueError("cursor was issued for a different date filter")
+        query = query.start_after(
+            {'updated_at': position['updated_at'], '__name__': position['id']} if by_time
+            else {'__name__': position['id']}
+        )
+
+    snapshots = list(query.limit(page_size + 1).stream())
+    next_cursor = None
+    if len(snapshots) > page_size:
+        snapshots = snapshots[:page_size]
+        last = snapshots[-1]
+        next_cursor = encode_cursor(last.id, last.get('updated_at') if by_time else None)
+
+    items = []
+    for snapshot in snapshots:
+        data = snapshot.to_dict()
+        keep = fields if fields is not None else TRACKED_FIELDS
+        items.append({"id": snapshot.id, **{
+            field: json_value(data[field]) for field in keep if field in data
+        }})
+    return items, next_cursor
+
+
+def lookup_tracked(db, url: str | None = None, email: str | None = None) -> dict:
+    """Whether a URL, an email, or an email for a URL is tracked, read from Firestore.
+
+    With a url the result has url_tracked, plus email_tracked (for that
+    URL) when an email is given. With only an email it has email_tracked
+    and the tracked URLs the email is associated with.
+    """
+    collection = db.collection(COLLECTION)
+    if url is not None:
+        snapshot = collection.document(encode_url(url)).get(field_paths=['emails'])
+        result = {"url_tracked": snapshot.exists}
+        if email is not None:
+            result["email_tracked"] = snapshot.exists and email in (snapshot.to_dict().get('emails') or [])
+        return result
+    query = collection.where(filter=FieldFilter('emails', 'array_contains', email)).select(['url'])
+    urls = sorted(snapshot.to_dict().get('url', '') for snapshot in query.stream())
+    return {"email_tracked": bool(urls), "urls": urls}